@@ -0,0 +1,69 @@
+import os
+import shutil
+
+# CPU pinning for benchmark clients and their postgres instances (Linux only).
+# Client processes are started under taskset, postgres is pinned after it starts by setting the
+# affinity of the postmaster and every process below it; backends forked later inherit it.
+
+
+def affinity_supported() -> bool:
+    return hasattr(os, "sched_setaffinity") and shutil.which("taskset") is not None
+
+
+def parse_cpu_list(spec: str) -> set[int]:
+    """Parse a taskset-style CPU list such as "0-3,6" into a set of CPU ids."""
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def client_prefix(cpu_spec: str | None) -> list[str]:
+    """Command prefix that runs a client process on the given CPUs."""
+    if not cpu_spec:
+        return []
+    return ["taskset", "-c", cpu_spec]
+
+
+def postmaster_pid(data_dir: str) -> int:
+    with open(os.path.join(data_dir, "postmaster.pid")) as f:
+        return int(f.readline().strip())
+
+
+def process_tree(pid: int) -> list[int]:
+    """pid and all of its descendants, read from /proc/<pid>/task/*/children."""
+    pids = [pid]
+    task_dir = f"/proc/{pid}/task"
+    try:
+        tids = os.listdir(task_dir)
+    except FileNotFoundError:
+        return pids
+    for tid in tids:
+        try:
+            with open(os.path.join(task_dir, tid, "children")) as f:
+                children = [int(child) for child in f.read().split()]
+        except FileNotFoundError:
+            continue
+        for child in children:
+            pids.extend(process_tree(child))
+    return pids
+
+
+def pin_postgres(data_dir: str, cpu_spec: str) -> list[int]:
+    """Pin a running postgres instance (postmaster and children) to cpu_spec, returns the pinned pids."""
+    cpus = parse_cpu_list(cpu_spec)
+    pinned = []
+    for pid in process_tree(postmaster_pid(data_dir)):
+        try:
+            os.sched_setaffinity(pid, cpus)
+            pinned.append(pid)
+        except ProcessLookupError:
+            continue
+    return pinned
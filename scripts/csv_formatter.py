@@ -12,11 +12,25 @@ RESULTS_DIR = os.path.join(PROJECT_ROOT, "results")
 # Metrics to evaluate (duration is time, not energy)
 ENERGY_METRICS = ['cpu_energy', 'ram_energy', 'energy_consumed']
 ALL_METRICS = ENERGY_METRICS + ['duration']
+# Memory footprint and client/postgres backend CPU and I/O per operation, from the harness summaries
+# (results/<size>/<stack>_<size>_v2/harness/)
+MEMORY_METRICS = ['heap_peak_kb', 'rss_delta_kb', 'peak_rss_kb', 'objects_total']
+BACKEND_METRICS = ['client_cpu_s', 'backend_cpu_s', 'backend_read_bytes', 'backend_write_bytes']
+HARNESS_METRICS = MEMORY_METRICS + BACKEND_METRICS
 
 CRUD_ORDER = [
     "create_customer",
+    "create_customers_bulk_10",
+    "create_customers_bulk_100",
+    "create_customers_bulk_1000",
+    "create_customers_bulk_10000",
     "get_customers",
+    "stream_customers",
     "get_customer_by_id",
+    "get_customers_by_ids_1",
+    "get_customers_by_ids_10",
+    "get_customers_by_ids_100",
+    "get_customers_by_ids_1000",
     "fetch_top_spending_customers",
     "update_customer_email",
     "update_many_contract_types",
@@ -25,6 +39,12 @@ CRUD_ORDER = [
 ]
 
 
+def ordered_queries(queries):
+    """CRUD_ORDER first, then any other workload steps (custom workloads and mixes) by name."""
+    extra = sorted(set(queries) - set(CRUD_ORDER))
+    return CRUD_ORDER + extra
+
+
 def parse_filename(filename):
     parts = filename.replace('.csv', '').split('_')
     query_name = '_'.join(parts[1:-1])
@@ -33,8 +53,28 @@ def parse_filename(filename):
 
 
 def load_metric_values(filepath, metrics):
+    if not os.path.exists(filepath):
+        return {}
+    df = pd.read_csv(filepath)
+    return {metric: df[metric].dropna().astype(float).tolist() for metric in metrics if metric in df.columns}
+
+
+def merge_type_counts(filepath, top=5):
+    """Average object counts per type over the runs' objects_by_type, largest first."""
+    if not os.path.exists(filepath):
+        return ""
     df = pd.read_csv(filepath)
-    return {metric: df[metric].dropna().astype(float).tolist() for metric in metrics}
+    if "objects_by_type" not in df.columns:
+        return ""
+    runs = df["objects_by_type"].dropna().astype(str).tolist()
+    totals = {}
+    for run in runs:
+        for entry in run.split(";"):
+            name, _, count = entry.rpartition(":")
+            if name:
+                totals[name] = totals.get(name, 0) + int(count)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return ";".join(f"{name}:{round(count / len(runs))}" for name, count in ranked)
 
 
 def format_result(orm_avg, sql_avg):
@@ -97,11 +137,39 @@ def process_record_size(record_count):
 
             row[f"result_{metric}"] = format_result(orm_avg, sql_avg)
 
+        orm_harness_path = os.path.join(orm_dir, "harness", orm_file)
+        sql_harness_path = os.path.join(sql_dir, "harness", sql_file)
+        orm_harness = load_metric_values(orm_harness_path, HARNESS_METRICS)
+        sql_harness = load_metric_values(sql_harness_path, HARNESS_METRICS)
+
+        for metric in HARNESS_METRICS:
+            orm_list = orm_harness.get(metric, [])
+            sql_list = sql_harness.get(metric, [])
+            if not orm_list and not sql_list:
+                continue
+
+            orm_avg = sum(orm_list) / len(orm_list) if orm_list else 0.0
+            sql_avg = sum(sql_list) / len(sql_list) if sql_list else 0.0
+
+            row[f"orm_{metric}_avg"] = round(orm_avg, 6)
+            row[f"sql_{metric}_avg"] = round(sql_avg, 6)
+            row[f"result_{metric}"] = format_result(orm_avg, sql_avg)
+
+        # share of the CPU time spent in the postgres backend rather than the Python client
+        for stack in ("orm", "sql"):
+            client_cpu = row.get(f"{stack}_client_cpu_s_avg", 0.0)
+            backend_cpu = row.get(f"{stack}_backend_cpu_s_avg", 0.0)
+            if f"{stack}_backend_cpu_s_avg" in row and client_cpu + backend_cpu:
+                row[f"{stack}_backend_cpu_share"] = round(backend_cpu / (client_cpu + backend_cpu), 4)
+
+        row["orm_objects_by_type"] = merge_type_counts(orm_harness_path)
+        row["sql_objects_by_type"] = merge_type_counts(sql_harness_path)
+
         comparison_rows.append(row)
 
     df = pd.DataFrame(comparison_rows)
 
-    df["query"] = pd.Categorical(df["query"], categories=CRUD_ORDER, ordered=True)
+    df["query"] = pd.Categorical(df["query"], categories=ordered_queries(df["query"]), ordered=True)
     df.sort_values(by="query", inplace=True)
     df.to_csv(summary_file, index=False)
     print(f"Saved summary for {record_count} records to:\n{summary_file}")
@@ -129,7 +197,7 @@ def create_cross_record_comparison():
     result_data = []
 
     # Process each query according to CRUD_ORDER
-    for query in CRUD_ORDER:
+    for query in ordered_queries(pd.concat([summary["query"] for summary in summaries])):
         row = {'query': query}
 
         for i, record_size in enumerate(record_sizes):
@@ -194,7 +262,7 @@ def create_cross_record_comparison_trimmed():
 
     result_data = []
 
-    for query in CRUD_ORDER:
+    for query in ordered_queries(pd.concat([summary["query"] for summary in summaries])):
         row = {"query": query}
 
         for i, record_size in enumerate(record_sizes):
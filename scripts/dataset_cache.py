@@ -0,0 +1,87 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+# Binary columnar cache of the largest generated dataset, one .npy file per column.
+# Smaller datasets are prefixes of the largest, so a single cache serves every size
+# and is memory-mapped instead of re-parsing CSV on each seeding run.
+
+COLUMNS = [
+    "customer_id",
+    "name",
+    "age",
+    "email",
+    "signup_date",
+    "monthly_spend",
+    "contract_type",
+    "is_active",
+]
+META_FILE = "meta.json"
+
+
+def save_cache(df: pd.DataFrame, cache_dir: str, seed: int):
+    """Write each column of df as a fixed-width (memory-mappable) .npy array."""
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = {
+        "customer_id": df["customer_id"].to_numpy(dtype="U36"),
+        "name": df["name"].to_numpy(dtype=str),
+        "age": df["age"].to_numpy(dtype=np.int32),
+        "email": df["email"].to_numpy(dtype=str),
+        "signup_date": df["signup_date"].to_numpy(dtype="datetime64[D]"),
+        "monthly_spend": df["monthly_spend"].to_numpy(dtype=np.float64),
+        "contract_type": df["contract_type"].to_numpy(dtype=str),
+        "is_active": df["is_active"].to_numpy(dtype=bool),
+    }
+    for column, values in arrays.items():
+        np.save(os.path.join(cache_dir, f"{column}.npy"), values)
+
+    with open(os.path.join(cache_dir, META_FILE), "w") as f:
+        json.dump({"size": len(df), "seed": seed, "columns": COLUMNS}, f, indent=2)
+
+
+def cached_size(cache_dir: str) -> int:
+    with open(os.path.join(cache_dir, META_FILE)) as f:
+        return json.load(f)["size"]
+
+
+def load_cache(cache_dir: str, size: int | None = None) -> dict[str, np.ndarray]:
+    """Memory-map the cached columns, sliced to the first `size` rows."""
+    available = cached_size(cache_dir)
+    size = available if size is None else size
+    if size > available:
+        raise ValueError(f"Cache at {cache_dir} holds {available} rows, {size} requested")
+    return {
+        column: np.load(os.path.join(cache_dir, f"{column}.npy"), mmap_mode="r")[:size]
+        for column in COLUMNS
+    }
+
+
+def cache_to_dataframe(columns: dict[str, np.ndarray]) -> pd.DataFrame:
+    df = pd.DataFrame({column: np.asarray(values) for column, values in columns.items()})
+    df["signup_date"] = np.datetime_as_string(columns["signup_date"], unit="D")
+    return df
+
+
+def iter_cache_chunks(columns: dict[str, np.ndarray], chunk_size: int = 50_000):
+    """Yield DataFrame chunks of the cached columns, like pd.read_csv(chunksize=...)."""
+    total = len(columns["customer_id"])
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        yield cache_to_dataframe({column: values[start:stop] for column, values in columns.items()})
+
+
+def iter_cache_rows(columns: dict[str, np.ndarray], chunk_size: int = 50_000):
+    """Yield rows as tuples of strings in CSV column order, same shape as csv.reader rows."""
+    for chunk in iter_cache_chunks(columns, chunk_size):
+        yield from zip(
+            chunk["customer_id"].tolist(),
+            chunk["name"].tolist(),
+            [str(age) for age in chunk["age"].tolist()],
+            chunk["email"].tolist(),
+            chunk["signup_date"].tolist(),
+            [f"{spend:.2f}" for spend in chunk["monthly_spend"].tolist()],
+            chunk["contract_type"].tolist(),
+            ["True" if active else "False" for active in chunk["is_active"].tolist()],
+        )
@@ -1,14 +1,19 @@
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
 import pandas as pd
 from faker import Faker
-import uuid
 
-fake = Faker()
-Faker.seed(42)
+from dataset_cache import save_cache
+
+SEED = 42
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(ROOT_DIR, "data")
-os.makedirs(DATA_DIR, exist_ok=True)
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
 
 DATASET_SIZES = [
     1000,
@@ -24,39 +29,103 @@ DATASET_SIZES = [
     1024000,
 ]
 
-for size in DATASET_SIZES:
-    # listed above [1000, 2000, 4000... 1024000]
-    used_emails = set()
-    used_ids = set()
-    data = []
-
-    def generate_unique_email():
-        email = fake.email()
-        while email in used_emails:
-            email = fake.email()
-        used_emails.add(email)
-        return email
-
-    def generate_unique_customer_id():
-        customer_id = uuid.uuid4()
-        while customer_id in used_ids:
-            customer_id = uuid.uuid4()
-        used_ids.add(customer_id)
-        return customer_id
-
-    for _ in range(size):
-        data.append({
-            "customer_id": generate_unique_customer_id(),
-            "name": fake.name(),
-            "age": fake.random_int(min=18, max=80),
-            "email": generate_unique_email(),
-            "signup_date": fake.date_between(start_date='-5y', end_date='today'),
-            "monthly_spend": round(fake.pyfloat(left_digits=2, right_digits=2, positive=True), 2),
-            "contract_type": fake.random_element(elements=("Monthly", "Yearly", "Prepaid")),
-            "is_active": fake.boolean()
-        })
-
-    df = pd.DataFrame(data)
-    file_path = os.path.join(DATA_DIR, f"fake_data_{size}.csv")
-    df.to_csv(file_path, index=False)
-    print(f"Generated {size} unique records and saved to {file_path}")
\ No newline at end of file
+CONTRACT_TYPES = np.array(["Monthly", "Yearly", "Prepaid"])
+
+# rows handed to each Faker worker process
+TEXT_CHUNK_SIZE = 50_000
+
+
+def generate_customer_ids(rng: np.random.Generator, size: int) -> list[str]:
+    """Version 4 UUIDs whose last 48 bits are the row index, so they're unique by construction."""
+    raw = rng.integers(0, 256, size=(size, 16), dtype=np.uint8)
+    index = np.arange(size, dtype=">u8").view(np.uint8).reshape(size, 8)
+    raw[:, 10:] = index[:, 2:]
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    hexed = raw.tobytes().hex()
+    return [
+        f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        for h in (hexed[i:i + 32] for i in range(0, 32 * size, 32))
+    ]
+
+
+def generate_text_chunk(start: int, count: int, seed: int) -> tuple[list[str], list[str]]:
+    """Names and emails for rows [start, start + count), run in a worker process.
+
+    Each chunk seeds its own Faker, so output only depends on the seed and the chunk offset.
+    The row index in the email's local part keeps emails unique without a lookup set.
+    """
+    fake = Faker()
+    fake.seed_instance(seed + start)
+    names = [fake.name() for _ in range(count)]
+    emails = [f"{fake.user_name()}{start + i}@{fake.free_email_domain()}" for i in range(count)]
+    return names, emails
+
+
+def generate_text_columns(size: int, seed: int, workers: int | None) -> tuple[list[str], list[str]]:
+    starts = list(range(0, size, TEXT_CHUNK_SIZE))
+    counts = [min(TEXT_CHUNK_SIZE, size - start) for start in starts]
+
+    names, emails = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_names, chunk_emails in pool.map(generate_text_chunk, starts, counts, [seed] * len(starts)):
+            names.extend(chunk_names)
+            emails.extend(chunk_emails)
+    return names, emails
+
+
+def generate_dataset(size: int, seed: int = SEED, workers: int | None = None) -> pd.DataFrame:
+    """Build one dataset with numeric/categorical columns as NumPy arrays and text columns in parallel."""
+    rng = np.random.default_rng(seed)
+
+    customer_ids = generate_customer_ids(rng, size)
+    ages = rng.integers(18, 81, size=size)
+    today = np.datetime64(date.today(), "D")
+    signup_dates = today - rng.integers(0, 5 * 365 + 1, size=size).astype("timedelta64[D]")
+    monthly_spend = rng.integers(1, 10_000, size=size) / 100
+    contract_types = CONTRACT_TYPES[rng.integers(0, len(CONTRACT_TYPES), size=size)]
+    is_active = rng.random(size) < 0.5
+
+    names, emails = generate_text_columns(size, seed, workers)
+
+    return pd.DataFrame({
+        "customer_id": customer_ids,
+        "name": names,
+        "age": ages,
+        "email": emails,
+        "signup_date": np.datetime_as_string(signup_dates, unit="D"),
+        "monthly_spend": monthly_spend,
+        "contract_type": contract_types,
+        "is_active": is_active,
+    })
+
+
+def main():
+    p = argparse.ArgumentParser(description="Generate fake customer datasets.")
+    p.add_argument(
+        "-s", "--sizes",
+        help="Comma-separated dataset sizes to generate (defaults to DATASET_SIZES)",
+        default=None
+    )
+    p.add_argument("--seed", type=int, default=SEED, help="Random seed shared by NumPy and Faker")
+    p.add_argument("--workers", type=int, default=None, help="Faker worker processes (defaults to CPU count)")
+    p.add_argument("--no-csv", action="store_true", help="Only write the binary column cache, skip per-size CSVs")
+    args = p.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(",")) if args.sizes else DATASET_SIZES
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    # generate the largest dataset once, every smaller size is a prefix of it
+    df = generate_dataset(sizes[-1], seed=args.seed, workers=args.workers)
+    save_cache(df, CACHE_DIR, seed=args.seed)
+    print(f"Generated {len(df)} unique records and cached columns in {CACHE_DIR}")
+
+    if not args.no_csv:
+        for size in sizes:
+            file_path = os.path.join(DATA_DIR, f"fake_data_{size}.csv")
+            df.head(size).to_csv(file_path, index=False)
+            print(f"Saved first {size} records to {file_path}")
+
+
+if __name__ == "__main__":
+    main()
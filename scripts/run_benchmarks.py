@@ -0,0 +1,444 @@
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from cpu_affinity import affinity_supported, client_prefix, pin_postgres
+from restart_postgres import ORM_DIR, SQL_DIR
+
+# Resumable replacement for the orchestration.sh loop. Every (size, stack, repetition) run is recorded
+# in a persistent manifest, so an interrupted or failed experiment picks up where it stopped.
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "results")
+
+SEED_SCRIPT = os.path.join(SCRIPT_DIR, "seed_database.py")
+FORMATTER_SCRIPT = os.path.join(SCRIPT_DIR, "csv_formatter.py")
+RESTART_SCRIPT = os.path.join(SCRIPT_DIR, "restart_postgres.py")
+SNAPSHOT_SCRIPT = os.path.join(SCRIPT_DIR, "snapshot_database.py")
+TRACKERS = {
+    "orm": os.path.join(PROJECT_ROOT, "src", "orm_experiments", "orm_energy_tracker_v2.py"),
+    "sql": os.path.join(PROJECT_ROOT, "src", "sql_experiments", "sql_energy_tracker_v2.py"),
+}
+ASYNC_TRACKERS = {
+    "orm": os.path.join(PROJECT_ROOT, "src", "orm_experiments", "orm_async_energy_tracker.py"),
+    "sql": os.path.join(PROJECT_ROOT, "src", "sql_experiments", "sql_async_energy_tracker.py"),
+}
+
+POSTGRES_DATA_DIRS = {"orm": ORM_DIR, "sql": SQL_DIR}
+
+DEFAULT_CONFIG = os.path.join(PROJECT_ROOT, "benchmark_config.json")
+DEFAULT_MANIFEST = os.path.join(RESULTS_DIR, "run_manifest.json")
+PHASE_TIMINGS_FILE = os.path.join(RESULTS_DIR, "phase_timings.csv")
+AFFINITY_LAYOUT_FILE = os.path.join(RESULTS_DIR, "affinity_layout.csv")
+
+DEFAULTS = {
+    "record_sizes": [1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, 256000, 512000, 1024000],
+    "repeat_count": 10,
+    "sleep_duration": 5,
+    "stacks": ["orm", "sql"],
+    "use_snapshots": True,
+    "max_attempts": 3,
+    "env": {},
+    # run the ORM and SQL pipelines at the same time instead of one after the other
+    "parallel": False,
+    # optional pinning, e.g. {"orm": {"client": "0-1", "postgres": "2-3"}, "sql": {"client": "4-5", "postgres": "6-7"}}
+    "cpu_sets": {},
+    # max seconds one parallel pipeline waits for the other before tracking unsynchronised
+    "sync_timeout": 3600,
+    # also run the asyncio trackers (concurrent coroutines, see ASYNC_CONCURRENCY) after the sync ones
+    "async": False,
+}
+
+# serialises manifest and CSV writes when the pipelines run in parallel threads
+_write_lock = threading.Lock()
+
+PHASES = ["restart", "seed", "track", "format"]
+
+
+def load_config(path: str) -> dict:
+    config = dict(DEFAULTS)
+    if os.path.exists(path):
+        with open(path) as f:
+            config.update(json.load(f))
+    else:
+        print(f"No config at {path}, using defaults.")
+    return config
+
+
+def run_key(record_count: int, stack: str, name, config: dict) -> str:
+    """Manifest key "<size>/<stack>/<name>", with a hash of the env dimensions when config["env"] sets any,
+    so a run with other settings isn't skipped as already completed."""
+    key = f"{record_count}/{stack}/{name}"
+    if config["env"]:
+        env_hash = hashlib.sha1(json.dumps(config["env"], sort_keys=True).encode()).hexdigest()[:8]
+        key = f"{key}@{env_hash}"
+    return key
+
+
+class Manifest:
+    """Persistent record of finished and failed runs, keyed by run_key()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.runs = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.runs = json.load(f)
+
+    def status(self, key: str) -> str | None:
+        return self.runs.get(key, {}).get("status")
+
+    def attempts(self, key: str) -> int:
+        return self.runs.get(key, {}).get("attempts", 0)
+
+    def record(self, key: str, status: str, **details):
+        with _write_lock:
+            entry = self.runs.setdefault(key, {"attempts": 0})
+            if status in ("completed", "failed"):
+                entry["attempts"] += 1
+            entry.update(status=status, updated=datetime.now().isoformat(timespec="seconds"), **details)
+            self.save()
+
+    def reset_failed(self):
+        """Give failed runs a fresh set of attempts."""
+        for entry in self.runs.values():
+            if entry.get("status") in ("failed", "running"):
+                entry["attempts"] = 0
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.runs, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def data_source_args(record_count: int) -> list[str]:
+    """Seed from the memory-mapped column cache when it exists, else parse the CSV."""
+    if os.path.exists(os.path.join(CACHE_DIR, "meta.json")):
+        return ["--cache-dir", CACHE_DIR, "--record-count", str(record_count)]
+    return ["--data-path", os.path.join(DATA_DIR, f"fake_data_{record_count}.csv")]
+
+
+def run_command(args: list[str], env: dict | None = None, cpus: str | None = None):
+    subprocess.run([*client_prefix(cpus), sys.executable, *args], check=True, env={**os.environ, **(env or {})})
+
+
+def append_csv_row(path: str, header: list[str], row: list):
+    with _write_lock:
+        write_header = not os.path.exists(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(header)
+            writer.writerow(row)
+
+
+def record_phase_timing(record_count: int, stack: str, repetition: int | str, phase: str, seconds: float):
+    append_csv_row(
+        PHASE_TIMINGS_FILE,
+        ["timestamp", "record_size", "stack", "repetition", "phase", "seconds"],
+        [datetime.now().isoformat(timespec="seconds"), record_count, stack, repetition, phase, round(seconds, 3)]
+    )
+
+
+def execution_mode(config: dict, synchronised: bool = True) -> str:
+    if not config["parallel"]:
+        return "serial"
+    return "parallel" if synchronised else "parallel_unsynchronised"
+
+
+def record_affinity_layout(record_count: int, stack: str, repetition: int, config: dict, postgres_pids: list[int],
+                           execution: str):
+    cpu_set = config["cpu_sets"].get(stack, {})
+    append_csv_row(
+        AFFINITY_LAYOUT_FILE,
+        ["timestamp", "record_size", "stack", "repetition", "execution", "client_cpus", "postgres_cpus",
+         "postgres_pids"],
+        [datetime.now().isoformat(timespec="seconds"), record_count, stack, repetition, execution,
+         cpu_set.get("client", ""), cpu_set.get("postgres", ""), ";".join(str(pid) for pid in postgres_pids)]
+    )
+
+
+def timed(phase: str, record_count: int, stack: str, repetition, timings: dict, func, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        with _write_lock:
+            timings[phase] = timings.get(phase, 0.0) + elapsed
+        record_phase_timing(record_count, stack, repetition, phase, elapsed)
+
+
+class PipelineSync:
+    """Lines the parallel pipelines up so neither restarts postgres (and drops OS caches) while the other
+    is being tracked. Every synchronisation point gets its own barrier, so a timeout only leaves that run
+    unsynchronised; once one pipeline has finished the other carries on alone."""
+
+    def __init__(self, parties: int, timeout: float):
+        self._parties = parties
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._barriers = {}
+        self._waits = {}
+        self._released = parties <= 1
+
+    def wait(self, stack: str) -> bool:
+        """Wait for the other pipeline, False if it didn't arrive in time."""
+        with self._lock:
+            if self._released:
+                return True
+            index = self._waits.get(stack, 0)
+            self._waits[stack] = index + 1
+            barrier = self._barriers.setdefault(index, threading.Barrier(self._parties))
+        try:
+            barrier.wait(timeout=self._timeout)
+        except threading.BrokenBarrierError:
+            # kept broken, so the late pipeline doesn't wait again at this point
+            if self._released:
+                return True
+            print(f"{stack.upper()} pipeline continuing without the other pipeline, this run may interfere")
+            return False
+        with self._lock:
+            self._barriers.pop(index, None)
+        return True
+
+    def release(self):
+        with self._lock:
+            self._released = True
+            for barrier in self._barriers.values():
+                barrier.abort()
+
+
+def stack_results_dir(record_count: int, stack: str) -> str:
+    return os.path.join(RESULTS_DIR, str(record_count), f"{stack}_{record_count}_v2")
+
+
+class ResultsCheckpoint:
+    """Copy of a stack's results directory taken before an attempt. The trackers append their rows even when
+    they fail, so a failed attempt is rolled back to the copy and its retry doesn't add a second set of rows."""
+
+    def __init__(self, results_dir: str):
+        self.results_dir = results_dir
+        self.backup_dir = f"{results_dir}.attempt"
+        # a copy left behind means the previous attempt was interrupted, its rows are discarded too
+        if os.path.isdir(self.backup_dir):
+            shutil.rmtree(results_dir, ignore_errors=True)
+            os.replace(self.backup_dir, results_dir)
+        self.existed = os.path.isdir(results_dir)
+        if self.existed:
+            shutil.copytree(results_dir, self.backup_dir)
+
+    def rollback(self):
+        shutil.rmtree(self.results_dir, ignore_errors=True)
+        if self.existed:
+            os.replace(self.backup_dir, self.results_dir)
+
+    def commit(self):
+        shutil.rmtree(self.backup_dir, ignore_errors=True)
+
+
+def seed_env(stack: str, config: dict) -> dict:
+    return {**config["env"], "USE_ORM": "true" if stack == "orm" else "false"}
+
+
+def prepare_snapshot(record_count: int, stack: str, config: dict, manifest: Manifest, timings: dict):
+    """Seed the size once and snapshot it, unless a snapshot from an earlier run is still there."""
+    key = run_key(record_count, stack, "snapshot", config)
+    snapshot_args = [SNAPSHOT_SCRIPT, f"--{stack}", "--record-count", str(record_count)]
+    env = {**os.environ, **config["env"]}
+    if manifest.status(key) == "completed" and \
+            subprocess.run([sys.executable, *snapshot_args, "--exists"], env=env).returncode == 0:
+        return
+
+    def seed_and_snapshot():
+        run_command([SEED_SCRIPT, *data_source_args(record_count)], env=seed_env(stack, config))
+        run_command([*snapshot_args, "--create"], env=config["env"])
+
+    timed("seed", record_count, stack, "snapshot", timings, seed_and_snapshot)
+    manifest.record(key, "completed")
+
+
+def run_once(record_count: int, stack: str, repetition: int, config: dict, timings: dict,
+             sync: PipelineSync | None = None) -> tuple[list[int], bool]:
+    """One repetition: restart postgres, restore or seed, run the tracker. Returns the pinned postgres pids and
+    whether the parallel pipelines stayed synchronised around the tracking."""
+    cpu_set = config["cpu_sets"].get(stack, {})
+    client_cpus = cpu_set.get("client")
+
+    timed("restart", record_count, stack, repetition, timings,
+          run_command, [RESTART_SCRIPT, f"--{stack}"])
+    postgres_pids = []
+    if cpu_set.get("postgres"):
+        postgres_pids = pin_postgres(POSTGRES_DATA_DIRS[stack], cpu_set["postgres"])
+
+    if config["use_snapshots"]:
+        timed("seed", record_count, stack, repetition, timings,
+              run_command, [SNAPSHOT_SCRIPT, f"--{stack}", "--restore", "--record-count", str(record_count)],
+              env=config["env"], cpus=client_cpus)
+    else:
+        timed("seed", record_count, stack, repetition, timings,
+              run_command, [SEED_SCRIPT, *data_source_args(record_count)], env=seed_env(stack, config),
+              cpus=client_cpus)
+
+    tracker_env = {
+        **config["env"],
+        "RECORD_COUNT": str(record_count),
+        "PYTHONPATH": PROJECT_ROOT,
+        "EXECUTION_MODE": execution_mode(config),
+    }
+    synchronised = sync.wait(stack) if sync else True
+    try:
+        timed("track", record_count, stack, repetition, timings,
+              run_command, [TRACKERS[stack]], env=tracker_env, cpus=client_cpus)
+        if config["async"]:
+            timed("track", record_count, stack, repetition, timings,
+                  run_command, [ASYNC_TRACKERS[stack]], env=tracker_env, cpus=client_cpus)
+    finally:
+        if sync and not sync.wait(stack):
+            synchronised = False
+    return postgres_pids, synchronised
+
+
+def run_stack(record_count: int, stack: str, config: dict, manifest: Manifest, timings: dict,
+              sync: PipelineSync | None = None) -> bool:
+    """Run every outstanding repetition for one stack, returns False if any run is still failing."""
+    try:
+        return _run_stack(record_count, stack, config, manifest, timings, sync)
+    finally:
+        # a finished pipeline must not keep the other one waiting
+        if sync:
+            sync.release()
+
+
+def _run_stack(record_count: int, stack: str, config: dict, manifest: Manifest, timings: dict,
+               sync: PipelineSync | None) -> bool:
+    all_ok = True
+    if config["use_snapshots"]:
+        try:
+            prepare_snapshot(record_count, stack, config, manifest, timings)
+        except subprocess.CalledProcessError as e:
+            manifest.record(run_key(record_count, stack, "snapshot", config), "failed", error=str(e))
+            print(f"Snapshot for {stack} {record_count} failed, skipping its runs:\n{e}")
+            return False
+
+    for repetition in range(1, config["repeat_count"] + 1):
+        key = run_key(record_count, stack, repetition, config)
+        if manifest.status(key) == "completed":
+            print(f"----- {stack.upper()} Run {repetition}: already completed, skipping -----")
+            continue
+
+        while manifest.attempts(key) < config["max_attempts"]:
+            print(f"\n----- {stack.upper()} Run {repetition} (attempt {manifest.attempts(key) + 1}) -----")
+            manifest.record(key, "running")
+            start = time.perf_counter()
+            checkpoint = ResultsCheckpoint(stack_results_dir(record_count, stack))
+            try:
+                postgres_pids, synchronised = run_once(record_count, stack, repetition, config, timings, sync)
+            except (subprocess.CalledProcessError, OSError) as e:
+                checkpoint.rollback()
+                manifest.record(key, "failed", error=str(e))
+                print(f"{stack.upper()} run {repetition} for {record_count} records failed:\n{e}")
+                continue
+            checkpoint.commit()
+            execution = execution_mode(config, synchronised)
+            record_affinity_layout(record_count, stack, repetition, config, postgres_pids, execution)
+            manifest.record(
+                key,
+                "completed",
+                seconds=round(time.perf_counter() - start, 3),
+                execution=execution,
+                affinity=config["cpu_sets"].get(stack, {})
+            )
+            print(f"Sleeping {config['sleep_duration']}s before next run...")
+            time.sleep(config["sleep_duration"])
+            break
+
+        if manifest.status(key) != "completed":
+            all_ok = False
+    return all_ok
+
+
+def print_timing_summary(timings: dict):
+    total = sum(timings.values())
+    print("\n=== Phase timing summary ===")
+    for phase in PHASES:
+        seconds = timings.get(phase, 0.0)
+        share = seconds / total * 100 if total else 0.0
+        print(f"{phase:>8}: {seconds:10.1f}s ({share:4.1f}%)")
+    print(f"{'total':>8}: {total:10.1f}s")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Run the ORM vs SQL energy benchmarks, resuming from the manifest.")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="JSON config with sizes, repeat count and sleep")
+    p.add_argument("--manifest", default=DEFAULT_MANIFEST, help="Run manifest to resume from")
+    p.add_argument("--fresh", action="store_true", help="Ignore and overwrite the existing manifest")
+    p.add_argument("--retry-failed", action="store_true", help="Reset attempt counts of failed runs")
+    args = p.parse_args()
+
+    config = load_config(args.config)
+    if config["cpu_sets"] and not affinity_supported():
+        print("CPU pinning needs Linux sched_setaffinity and taskset, running unpinned.")
+        config["cpu_sets"] = {}
+    if args.fresh and os.path.exists(args.manifest):
+        os.remove(args.manifest)
+    manifest = Manifest(args.manifest)
+    if args.retry_failed:
+        manifest.reset_failed()
+    timings = {}
+    failed = []
+
+    for record_count in config["record_sizes"]:
+        print("\n======================================")
+        print(f"Experimental test for dataset: {record_count} records")
+        print(f"Running {config['repeat_count']} repetitions")
+        print("======================================")
+
+        if config["parallel"]:
+            sync = PipelineSync(len(config["stacks"]), config["sync_timeout"])
+            with ThreadPoolExecutor(max_workers=len(config["stacks"])) as pool:
+                futures = {
+                    stack: pool.submit(run_stack, record_count, stack, config, manifest, timings, sync)
+                    for stack in config["stacks"]
+                }
+                results = {stack: future.result() for stack, future in futures.items()}
+        else:
+            results = {
+                stack: run_stack(record_count, stack, config, manifest, timings)
+                for stack in config["stacks"]
+            }
+        failed.extend(f"{record_count}/{stack}" for stack, ok in results.items() if not ok)
+
+        print("\nRunning formatter...")
+        try:
+            timed("format", record_count, "all", "-", timings,
+                  run_command, [FORMATTER_SCRIPT, "--records", str(record_count)])
+        except subprocess.CalledProcessError as e:
+            print(f"Formatter failed for {record_count} records:\n{e}")
+
+        print(f"\nExperimental test for {record_count} records complete")
+
+    print_timing_summary(timings)
+    if failed:
+        print(f"\nRuns still failing after {config['max_attempts']} attempts: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,82 @@
 import os
 import sys
+import io
+import csv
 import time
+import uuid
+import struct
 import pandas as pd
 import argparse
 import logging
+from datetime import date
+from decimal import Decimal
 logging.basicConfig(level=logging.INFO)
 
 parser = argparse.ArgumentParser(description="Seed the database with a specific dataset")
-parser.add_argument("--data-path", required=True, help="Path to the CSV data file to seed")
+source_group = parser.add_mutually_exclusive_group(required=True)
+source_group.add_argument("--data-path", help="Path to the CSV data file to seed")
+source_group.add_argument("--cache-dir", help="Binary column cache written by generate_fake_data.py")
+parser.add_argument(
+    "--record-count",
+    type=int,
+    default=None,
+    help="Rows to seed from --cache-dir, datasets are prefixes of the cached one (defaults to all)"
+)
+parser.add_argument(
+    "--sql-method",
+    choices=["insert", "copy", "copy-binary"],
+    default="copy",
+    help="Raw SQL seeding path: row-by-row INSERT, streaming text COPY or streaming binary COPY"
+)
+parser.add_argument(
+    "--staging",
+    action="store_true",
+    help="COPY into an unlogged staging table and merge into customer with ON CONFLICT"
+)
+parser.add_argument(
+    "--orm-method",
+    choices=["objects", "chunked"],
+    default="chunked",
+    help="ORM seeding path: one Customer object per row, or chunked Core insert(Customer) batches"
+)
+parser.add_argument(
+    "--batch-size",
+    type=int,
+    default=10_000,
+    help="Rows per batch for chunked ORM seeding"
+)
+parser.add_argument(
+    "--index-profile",
+    default=os.getenv("INDEX_PROFILE", "none").lower(),
+    help="Named secondary index profile to apply after seeding (defaults to $INDEX_PROFILE or 'none'), "
+         "the trackers read the applied profile back from the database for their results"
+)
 args = parser.parse_args()
 
-DATA_FILE = os.path.abspath(args.data_path)
+DATA_FILE = os.path.abspath(args.data_path) if args.data_path else None
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from dataset_cache import load_cache, cache_to_dataframe, iter_cache_chunks, iter_cache_rows
+
+# memory-mapped columns, only when seeding from the binary cache
+CACHE_COLUMNS = load_cache(args.cache_dir, args.record_count) if args.cache_dir else None
+
 from psycopg2 import sql
+from sqlalchemy import insert
 from src.data_access.models.customer import Customer
-from src.data_access.models.base import Base
+from src.data_access.models.schema import (
+    INDEX_PROFILES,
+    apply_index_profile,
+    create_customer_table,
+    drop_customer_table,
+)
 import subprocess
 import socket
 
+if args.index_profile not in INDEX_PROFILES:
+    parser.error(f"unknown --index-profile '{args.index_profile}', expected one of {list(INDEX_PROFILES)}")
+
 ORM_PORT = 5433
 SQL_PORT = 5434
 ORM_DATA_DIR = os.path.expanduser("~/postgres_data/orm")
@@ -61,7 +118,7 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 def clear_table_raw_sql():
-    with get_raw_connection() as conn:
+    with raw_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("DELETE FROM customer;")
         conn.commit()
@@ -69,35 +126,31 @@ def clear_table_raw_sql():
 
 
 def drop_raw_table_if_exists():
-    with get_raw_connection() as conn:
+    with raw_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("DROP TABLE IF EXISTS customer;")
+            drop_customer_table(cur)
         conn.commit()
     print("Dropped existing raw SQL 'customer' table.")
 
 
 def create_table_raw_sql():
-    with get_raw_connection() as conn:
+    with raw_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS customer (
-                    customer_id UUID PRIMARY KEY,
-                    name TEXT,
-                    age INTEGER,
-                    email TEXT,
-                    signup_date DATE,
-                    monthly_spend NUMERIC,
-                    contract_type TEXT,
-                    is_active BOOLEAN
-                );
-            """)
+            create_customer_table(cur)
         conn.commit()
     print("Table 'customer' persists in database")
 
 
+def load_dataframe() -> pd.DataFrame:
+    """Whole dataset as a DataFrame, from the binary cache when available, else the CSV."""
+    if CACHE_COLUMNS is not None:
+        return cache_to_dataframe(CACHE_COLUMNS)
+    return pd.read_csv(DATA_FILE)
+
+
 def seed_with_raw_sql():
-    df = pd.read_csv(DATA_FILE)
-    with get_raw_connection() as conn:
+    df = load_dataframe()
+    with raw_connection() as conn:
         with conn.cursor() as cur:
             for _, row in df.iterrows():
                 cur.execute(sql.SQL("""
@@ -110,6 +163,165 @@ def seed_with_raw_sql():
     logging.info(f"Seeded {len(df)} records to SQL database")
 
 
+COPY_COLUMNS = (
+    "customer_id, name, age, email, signup_date, monthly_spend, contract_type, is_active"
+)
+
+# binary COPY framing, see https://www.postgresql.org/docs/current/sql-copy.html#id-1.9.3.55.9.4
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+PG_EPOCH = date(2000, 1, 1)
+
+
+def encode_numeric(value: str) -> bytes:
+    """Encode a decimal string in PostgreSQL's binary NUMERIC format (base 10000 digits)."""
+    d = Decimal(value)
+    sign = 0x4000 if d.is_signed() else 0x0000
+    dscale = max(0, -d.as_tuple().exponent)
+    int_part, _, frac_part = format(abs(d), "f").partition(".")
+    int_part = int_part.lstrip("0")
+    int_part = int_part.zfill((len(int_part) + 3) // 4 * 4)
+    frac_part = frac_part.ljust((len(frac_part) + 3) // 4 * 4, "0")
+
+    digits = [int(int_part[i:i + 4]) for i in range(0, len(int_part), 4)]
+    digits += [int(frac_part[i:i + 4]) for i in range(0, len(frac_part), 4)]
+    weight = len(int_part) // 4 - 1
+    while digits and digits[0] == 0:
+        digits.pop(0)
+        weight -= 1
+    while digits and digits[-1] == 0:
+        digits.pop()
+    if not digits:
+        weight, sign = 0, 0x0000
+    return struct.pack(f">hhhh{len(digits)}h", len(digits), weight, sign, dscale, *digits)
+
+
+def encode_binary_row(row: list[str]) -> bytes:
+    """Encode one CSV row as a binary COPY tuple in customer column order."""
+    customer_id, name, age, email, signup_date, monthly_spend, contract_type, is_active = row
+    fields = (
+        uuid.UUID(customer_id).bytes,
+        name.encode("utf-8"),
+        struct.pack(">i", int(age)),
+        email.encode("utf-8"),
+        struct.pack(">i", (date.fromisoformat(signup_date) - PG_EPOCH).days),
+        encode_numeric(monthly_spend),
+        contract_type.encode("utf-8"),
+        b"\x01" if is_active.lower() in ("true", "t", "1") else b"\x00",
+    )
+    out = bytearray(struct.pack(">h", len(fields)))
+    for field in fields:
+        out += struct.pack(">i", len(field))
+        out += field
+    return bytes(out)
+
+
+class BinaryCopyStream:
+    """File-like object that encodes rows into binary COPY format as psycopg2 reads it."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = bytearray(PGCOPY_HEADER)
+        self._done = False
+        self.row_count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._done and (size < 0 or len(self._buffer) < size):
+            row = next(self._rows, None)
+            if row is None:
+                self._buffer += PGCOPY_TRAILER
+                self._done = True
+            else:
+                self._buffer += encode_binary_row(row)
+                self.row_count += 1
+        if size < 0:
+            size = len(self._buffer)
+        chunk = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return chunk
+
+
+class TextCopyStream:
+    """File-like object that writes rows as CSV text for COPY ... (FORMAT csv) as psycopg2 reads it."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+        self._done = False
+
+    def read(self, size: int = -1) -> str:
+        while not self._done and (size < 0 or len(self._pending) < size):
+            row = next(self._rows, None)
+            if row is None:
+                self._done = True
+            else:
+                self._writer.writerow(row)
+                if self._buffer.tell() >= 65536:
+                    self._flush()
+        self._flush()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+    def _flush(self):
+        self._pending += self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+
+def seed_with_copy(binary: bool = False, staging: bool = False):
+    """Stream the CSV file (or the binary cache) straight into COPY customer FROM STDIN (SQL)."""
+    target = "customer_staging" if staging else "customer"
+    if binary:
+        copy_format = "binary"
+    elif CACHE_COLUMNS is not None:
+        copy_format = "csv"
+    else:
+        copy_format = "csv, HEADER true"
+    start = time.perf_counter()
+
+    with raw_connection() as conn:
+        with conn.cursor() as cur:
+            if staging:
+                cur.execute("DROP TABLE IF EXISTS customer_staging;")
+                cur.execute("CREATE UNLOGGED TABLE customer_staging (LIKE customer INCLUDING DEFAULTS);")
+
+            copy_sql = f"COPY {target} ({COPY_COLUMNS}) FROM STDIN WITH (FORMAT {copy_format})"
+            if CACHE_COLUMNS is not None:
+                rows = iter_cache_rows(CACHE_COLUMNS)
+                source = BinaryCopyStream(rows) if binary else TextCopyStream(rows)
+                cur.copy_expert(copy_sql, source)
+            else:
+                with open(DATA_FILE, newline="", encoding="utf-8") as f:
+                    if binary:
+                        rows = csv.reader(f)
+                        next(rows)  # skip header
+                        cur.copy_expert(copy_sql, BinaryCopyStream(rows))
+                    else:
+                        cur.copy_expert(copy_sql, f)
+            row_count = cur.rowcount
+
+            if staging:
+                cur.execute(f"""
+                    INSERT INTO customer ({COPY_COLUMNS})
+                    SELECT {COPY_COLUMNS} FROM customer_staging
+                    ON CONFLICT (customer_id) DO NOTHING;
+                """)
+                row_count = cur.rowcount
+                cur.execute("DROP TABLE customer_staging;")
+        conn.commit()
+
+    elapsed = time.perf_counter() - start
+    method = "binary COPY" if binary else "text COPY"
+    logging.info(
+        f"Seeded {row_count} records to SQL database via {method}{' + staging merge' if staging else ''} "
+        f"in {elapsed:.2f}s ({row_count / elapsed:,.0f} rows/sec)"
+    )
+
+
 def clear_table_orm():
     session = SessionLocal()
     session.query(Customer).delete()
@@ -119,12 +331,27 @@ def clear_table_orm():
 
 
 def create_table():
-    Base.metadata.create_all(bind=engine)
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cur:
+            create_customer_table(cur)
+        conn.commit()
+    finally:
+        conn.close()
     print("Table 'customer' created in database")
 
 
+def apply_indexes(conn, profile: str):
+    """Apply a named index profile after seeding, on a DB-API connection from either stack."""
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        apply_index_profile(cur, profile)
+    conn.commit()
+    print(f"Applied index profile '{profile}' in {time.perf_counter() - start:.2f}s")
+
+
 def seed_with_sqlalchemy():
-    df = pd.read_csv(DATA_FILE)
+    df = load_dataframe()
     session = SessionLocal()
 
     customer = [
@@ -146,23 +373,70 @@ def seed_with_sqlalchemy():
     logging.info(f"Seeded {len(df)} records using SQLAlchemy ORM")
 
 
+def seed_with_sqlalchemy_chunked(batch_size: int = 10_000):
+    """Stream the CSV (or the binary cache) in fixed-size chunks and insert each with a Core
+    insert(Customer) batch (ORM)."""
+    start = time.perf_counter()
+    total = 0
+    if CACHE_COLUMNS is not None:
+        chunks = iter_cache_chunks(CACHE_COLUMNS, chunk_size=batch_size)
+    else:
+        chunks = pd.read_csv(DATA_FILE, chunksize=batch_size)
+
+    for batch_no, chunk in enumerate(chunks, start=1):
+        batch_start = time.perf_counter()
+        chunk["customer_id"] = chunk["customer_id"].map(uuid.UUID)
+        records = chunk.to_dict("records")
+
+        # executemany with insertmanyvalues, one short transaction per batch
+        with engine.begin() as conn:
+            conn.execute(insert(Customer), records)
+
+        total += len(records)
+        logging.info(
+            f"Batch {batch_no}: {len(records)} rows in {time.perf_counter() - batch_start:.3f}s "
+            f"({total} total)"
+        )
+
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Seeded {total} records using SQLAlchemy Core batches of {batch_size} "
+        f"in {elapsed:.2f}s ({total / elapsed:,.0f} rows/sec)"
+    )
+
+
 if __name__ == "__main__":
     if USE_ORM:
 
         start_postgres_instance(ORM_DATA_DIR, ORM_PORT)
-        from src.data_access.db_config.database import get_raw_connection, SessionLocal, engine
+        from src.data_access.db_config.database import SessionLocal, engine
 
         create_table()
         print("Clearing ORM database...")
         clear_table_orm()
-        print("Seeding ORM database...")
-        seed_with_sqlalchemy()
+        print(f"Seeding ORM database ({args.orm_method})...")
+        if args.orm_method == "objects":
+            seed_with_sqlalchemy()
+        else:
+            seed_with_sqlalchemy_chunked(batch_size=args.batch_size)
+        orm_conn = engine.raw_connection()
+        try:
+            apply_indexes(orm_conn, args.index_profile)
+        finally:
+            orm_conn.close()
     else:
         start_postgres_instance(SQL_DATA_DIR, SQL_PORT)
+        from src.data_access.db_config.database import raw_connection
+
         drop_raw_table_if_exists()
         create_table_raw_sql()
         print("Clearing SQL database...")
         clear_table_raw_sql()
-        print("Seeding SQL database...")
-        seed_with_raw_sql()
+        print(f"Seeding SQL database ({args.sql_method})...")
+        if args.sql_method == "insert":
+            seed_with_raw_sql()
+        else:
+            seed_with_copy(binary=args.sql_method == "copy-binary", staging=args.staging)
+        with raw_connection() as sql_conn:
+            apply_indexes(sql_conn, args.index_profile)
 
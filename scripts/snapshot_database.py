@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Seed a dataset size once into a template database, then restore the benchmark database from it
+# with CREATE DATABASE ... TEMPLATE before every repetition instead of re-inserting identical rows.
+
+ENV_PREFIXES = {
+    "orm": "ORM_BENCHMARK_DB",
+    "sql": "SQL_BENCHMARK_DB",
+}
+
+FINGERPRINT_QUERY = """
+    SELECT count(*), coalesce(sum(hashtextextended(c::text, 0)), 0)::text
+    FROM customer c;
+"""
+
+
+def connection_params(stack: str) -> dict:
+    prefix = ENV_PREFIXES[stack]
+    return {
+        "user": os.getenv(f"{prefix}_USER"),
+        "password": os.getenv(f"{prefix}_PASSWORD"),
+        "host": os.getenv(f"{prefix}_HOST"),
+        "port": os.getenv(f"{prefix}_PORT"),
+    }
+
+
+def database_name(stack: str) -> str:
+    return os.getenv(f"{ENV_PREFIXES[stack]}_NAME")
+
+
+def template_name(stack: str, record_count: int, index_profile: str) -> str:
+    return f"{database_name(stack)}_tpl_{record_count}_{index_profile}"
+
+
+def admin_connection(stack: str):
+    """Autocommit connection to the maintenance database, CREATE/DROP DATABASE can't run in a transaction."""
+    conn = psycopg2.connect(dbname="postgres", **connection_params(stack))
+    conn.autocommit = True
+    return conn
+
+
+def table_fingerprint(stack: str, dbname: str) -> dict:
+    """Row count and an order-independent checksum of every customer row."""
+    conn = psycopg2.connect(dbname=dbname, **connection_params(stack))
+    try:
+        with conn.cursor() as cur:
+            cur.execute(FINGERPRINT_QUERY)
+            rows, checksum = cur.fetchone()
+        conn.rollback()
+    finally:
+        conn.close()
+    return {"rows": rows, "checksum": checksum}
+
+
+def terminate_connections(cur, dbname: str):
+    cur.execute("""
+        SELECT pg_terminate_backend(pid)
+        FROM pg_stat_activity
+        WHERE datname = %s AND pid <> pg_backend_pid();
+    """, (dbname,))
+
+
+def copy_database(cur, target: str, source: str):
+    terminate_connections(cur, source)
+    terminate_connections(cur, target)
+    cur.execute(sql.SQL("DROP DATABASE IF EXISTS {};").format(sql.Identifier(target)))
+    cur.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {};").format(sql.Identifier(target), sql.Identifier(source)))
+
+
+def snapshot_exists(stack: str, record_count: int, index_profile: str) -> bool:
+    conn = admin_connection(stack)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT 1 FROM pg_database WHERE datname = %s;",
+                (template_name(stack, record_count, index_profile),)
+            )
+            return cur.fetchone() is not None
+    finally:
+        conn.close()
+
+
+def create_snapshot(stack: str, record_count: int, index_profile: str) -> dict:
+    """Copy the freshly seeded benchmark database into its template and record its fingerprint."""
+    dbname = database_name(stack)
+    template = template_name(stack, record_count, index_profile)
+    fingerprint = table_fingerprint(stack, dbname)
+
+    conn = admin_connection(stack)
+    try:
+        with conn.cursor() as cur:
+            copy_database(cur, template, dbname)
+            cur.execute(
+                sql.SQL("COMMENT ON DATABASE {} IS %s;").format(sql.Identifier(template)),
+                (json.dumps(fingerprint),)
+            )
+    finally:
+        conn.close()
+    print(f"Snapshot {template} created ({fingerprint['rows']} rows)")
+    return fingerprint
+
+
+def expected_fingerprint(cur, template: str) -> dict:
+    cur.execute("""
+        SELECT shobj_description(oid, 'pg_database')
+        FROM pg_database
+        WHERE datname = %s;
+    """, (template,))
+    row = cur.fetchone()
+    if row is None or row[0] is None:
+        raise RuntimeError(f"Snapshot {template} does not exist or has no recorded fingerprint")
+    return json.loads(row[0])
+
+
+def restore_snapshot(stack: str, record_count: int, index_profile: str) -> dict:
+    """Recreate the benchmark database from its template and verify row count and checksum."""
+    dbname = database_name(stack)
+    template = template_name(stack, record_count, index_profile)
+    start = time.perf_counter()
+
+    conn = admin_connection(stack)
+    try:
+        with conn.cursor() as cur:
+            expected = expected_fingerprint(cur, template)
+            copy_database(cur, dbname, template)
+    finally:
+        conn.close()
+
+    restored = table_fingerprint(stack, dbname)
+    if restored != expected:
+        raise RuntimeError(f"Restored {dbname} does not match {template}: expected {expected}, got {restored}")
+    print(f"Restored {dbname} from {template} ({restored['rows']} rows) in {time.perf_counter() - start:.2f}s")
+    return restored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or restore template-database snapshots")
+    stack_group = parser.add_mutually_exclusive_group(required=True)
+    stack_group.add_argument("--orm", action="store_true")
+    stack_group.add_argument("--sql", action="store_true")
+    action_group = parser.add_mutually_exclusive_group(required=True)
+    action_group.add_argument("--create", action="store_true", help="Snapshot the seeded benchmark database")
+    action_group.add_argument("--restore", action="store_true", help="Restore the benchmark database")
+    action_group.add_argument("--exists", action="store_true", help="Exit 0 if the snapshot exists, else 1")
+    parser.add_argument("--record-count", type=int, required=True)
+    parser.add_argument("--index-profile", default=os.getenv("INDEX_PROFILE", "none").lower())
+    args = parser.parse_args()
+
+    stack = "orm" if args.orm else "sql"
+    try:
+        if args.create:
+            create_snapshot(stack, args.record_count, args.index_profile)
+        elif args.restore:
+            restore_snapshot(stack, args.record_count, args.index_profile)
+        else:
+            sys.exit(0 if snapshot_exists(stack, args.record_count, args.index_profile) else 1)
+    except (RuntimeError, psycopg2.Error) as e:
+        print(f"Snapshot {'create' if args.create else 'restore'} failed:\n{e}")
+        sys.exit(1)
@@ -0,0 +1,176 @@
+import os
+import time
+import asyncio
+from contextvars import ContextVar
+from datetime import datetime
+
+from src.data_access.db_config.async_database import ASYNC_POOL_SIZE
+from src.data_access.db_config.latency import operation_scope, record_call
+from src.benchmark.harness import check_isolation, summarize, tracker_energy, write_summary
+from src.benchmark.workload import (
+    Stack,
+    mix_sequence,
+    selected_steps,
+    step_operations,
+    step_read_only,
+    validate_workload,
+    WORKLOAD_OPERATIONS,
+)
+
+# asyncio counterpart of the workload engine: every step runs on ASYNC_CONCURRENCY coroutines, each with its
+# own connection, concurrently on one event loop. The tracked window starts once every coroutine has its
+# connection and prepared arguments, and ends when the last one finishes. Operations over the whole table run
+# on at most ASYNC_FULL_TABLE_CONCURRENCY coroutines, since every coroutine holds its own copy of the result;
+# a step can set its own "concurrency", at most ASYNC_POOL_SIZE, as every coroutine holds a pooled connection.
+# Like the sync harness, writing calls run in a savepoint and read-only ones are followed by the stack's reset;
+# the time spent on either is isolation_total, and its share of the coroutines' time is left out of the energy
+# per iteration.
+
+ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", 32))
+ASYNC_FULL_TABLE_CONCURRENCY = int(os.getenv("ASYNC_FULL_TABLE_CONCURRENCY", 1))
+# calls of the operation per coroutine within one step (mix steps use their own count)
+ASYNC_OPERATIONS_PER_TASK = int(os.getenv("ASYNC_OPERATIONS_PER_TASK", 1))
+
+# index of the running coroutine within its step, set by run_step
+_task = ContextVar("async_workload_task", default=0)
+
+
+def task_index() -> int:
+    """Index of the calling coroutine within its step (0 outside a step), for prepares that need rows of their own."""
+    return _task.get()
+
+
+class AsyncOperation:
+    """Async repository call of one stack, see workload.Operation; run and prepare are coroutine functions.
+    `full_table` operations read or change every row, their steps run on at most ASYNC_FULL_TABLE_CONCURRENCY
+    coroutines; `read_only` operations run without a savepoint."""
+
+    def __init__(self, run, prepare=None, full_table: bool = False, read_only: bool = False):
+        self.run = run
+        self.prepare = prepare
+        self.full_table = full_table
+        self.read_only = read_only
+
+    async def bind(self, scope: dict, params: dict):
+        args = await self.prepare(**scope, **params) if self.prepare else params
+        return lambda: self.run(**scope, **args)
+
+
+def step_concurrency(stack: Stack, step: dict, concurrency: int) -> int:
+    """Coroutines of a step: its own "concurrency", else the default, capped for full-table operations."""
+    if "concurrency" in step:
+        return step["concurrency"]
+    if any(stack.operations[operation].full_table for operation in step_operations(step)):
+        return min(concurrency, ASYNC_FULL_TABLE_CONCURRENCY)
+    return concurrency
+
+
+def check_concurrency(stack: Stack, step: dict, name: str, concurrency: int):
+    """Refuse steps with more coroutines than pooled connections: the extra ones would wait for a connection
+    held by a coroutine that itself waits for them to be ready."""
+    coroutines = step_concurrency(stack, step, concurrency)
+    if coroutines > ASYNC_POOL_SIZE:
+        raise ValueError(f"Step {name!r} runs {coroutines} coroutines but ASYNC_POOL_SIZE is {ASYNC_POOL_SIZE}")
+
+
+async def wait_ready(ready: asyncio.Event, workers: list[asyncio.Task]):
+    """Wait until every worker is ready; if one fails first (e.g. no connection), cancel the rest and re-raise."""
+    waiter = asyncio.create_task(ready.wait())
+    done, _ = await asyncio.wait([waiter, *workers], return_when=asyncio.FIRST_COMPLETED)
+    if waiter in done:
+        return
+    waiter.cancel()
+    for worker in workers:
+        worker.cancel()
+    results = await asyncio.gather(*workers, return_exceptions=True)
+    for task, result in zip(workers, results):
+        if task in done and isinstance(result, BaseException):
+            raise result
+    raise RuntimeError("A worker finished before every worker was ready")
+
+
+async def run_step(stack: Stack, step: dict, name: str, params: dict, record_count: int, energy_session,
+                   summary_dir: str, concurrency: int, operations_per_task: int):
+    output_file = f"{stack.name}_{name}_{record_count}.csv"
+    concurrency = step_concurrency(stack, step, concurrency)
+    ready = asyncio.Event()
+    start = asyncio.Event()
+    prepared = 0
+    latencies_ns = []
+    isolation_ns = 0
+
+    @stack.connection(commit=False)
+    async def worker(index, **scope):
+        nonlocal prepared, isolation_ns
+        _task.set(index)
+        if "mix" not in step:
+            operation = stack.operations[step["operation"]]
+            sequence = [(await operation.bind(scope, params), operation.read_only)] * operations_per_task
+        else:
+            calls = [
+                (await stack.operations[entry["operation"]].bind(scope, entry.get("params", {})),
+                 stack.operations[entry["operation"]].read_only)
+                for entry in step["mix"]
+            ]
+            sequence = mix_sequence(step, calls)
+        prepared += 1
+        if prepared == concurrency:
+            ready.set()
+        await start.wait()
+        for call, read_only in sequence:
+            if read_only:
+                started = time.perf_counter_ns()
+                await call()
+                latencies_ns.append(time.perf_counter_ns() - started)
+                if stack.reset:
+                    resetting = time.perf_counter_ns()
+                    stack.reset(**scope)
+                    isolation_ns += time.perf_counter_ns() - resetting
+            else:
+                entering = time.perf_counter_ns()
+                async with stack.isolation(**scope):
+                    started = time.perf_counter_ns()
+                    await call()
+                    latencies_ns.append(time.perf_counter_ns() - started)
+                isolation_ns += time.perf_counter_ns() - entering - latencies_ns[-1]
+            record_call(latencies_ns[-1])
+
+    with operation_scope(name):
+        workers = [asyncio.create_task(worker(index)) for index in range(concurrency)]
+    await wait_ready(ready, workers)
+
+    tracker = energy_session.task(output_file)
+    tracker.start()
+    start.set()
+    window_start = time.perf_counter_ns()
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        window_ns = time.perf_counter_ns() - window_start
+        tracker.stop()
+
+    # isolation time is summed over the coroutines, so it is weighed against the time all of them were running
+    summary = summarize(latencies_ns, tracker_energy(tracker), len(latencies_ns), isolation_ns,
+                        window_ns * concurrency)
+    write_summary(os.path.join(summary_dir, output_file), {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "project_name": stack.project_name,
+        "iterations": len(latencies_ns),
+        "warmup": 0,
+        "isolation": "none" if step_read_only(stack, step) else "savepoint",
+        **summary,
+    })
+
+
+async def run_workload_async(stack: Stack, workload: list[dict], record_count: int, energy_session, summary_dir: str,
+                             concurrency: int = ASYNC_CONCURRENCY,
+                             operations_per_task: int = ASYNC_OPERATIONS_PER_TASK,
+                             only: list[str] = WORKLOAD_OPERATIONS):
+    """Run every step of the workload (or only the named ones) with concurrent coroutines, in order."""
+    validate_workload(stack, workload)
+    for step, name, _ in selected_steps(workload, only):
+        check_isolation(step_read_only(stack, step))
+        check_concurrency(stack, step, name, concurrency)
+    for step, name, params in selected_steps(workload, only):
+        await run_step(stack, step, name, params, record_count, energy_session, summary_dir,
+                       concurrency, operations_per_task)
@@ -0,0 +1,263 @@
+import os
+import csv
+import glob
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from codecarbon import EmissionsTracker
+
+# Pluggable energy backends for the trackers. "codecarbon" builds an EmissionsTracker per operation,
+# "rapl" brackets each operation with reads of the Linux powercap RAPL counters, which costs microseconds
+# instead of seconds and resolves sub-second operations. When the counters can't be read (no RAPL,
+# not Linux, or energy_uj not readable by this user) the rapl backend falls back to a process CPU-time
+# estimate and says so in the energy_backend column.
+
+ENERGY_BACKEND = os.getenv("ENERGY_BACKEND", "codecarbon").lower()
+# "shared": one tracker per process measures every operation as a task and all rows are written once at
+# the end, "per_operation": a fresh tracker per operation that writes its own row on stop
+TRACKER_SESSION = os.getenv("TRACKER_SESSION", "shared").lower()
+POWERCAP_DIR = os.getenv("POWERCAP_DIR", "/sys/class/powercap")
+# power drawn by one fully busy core, used only by the CPU-time fallback
+FALLBACK_WATTS_PER_CORE = float(os.getenv("ENERGY_FALLBACK_WATTS_PER_CORE", 10.0))
+
+MICROJOULES_PER_KWH = 3.6e12
+
+
+def _read_int(path: str) -> int:
+    with open(path) as f:
+        return int(f.read().strip())
+
+
+def _read_name(path: str) -> str:
+    with open(os.path.join(path, "name")) as f:
+        return f.read().strip()
+
+
+def rapl_domains(powercap_dir: str = POWERCAP_DIR) -> dict[str, list[str]]:
+    """Readable RAPL package and dram domain directories, keyed by "cpu" and "ram".
+
+    Package domains (intel-rapl:N) already include their core/uncore subdomains, so only dram
+    subdomains are read below them to avoid double counting.
+    """
+    domains = {"cpu": [], "ram": []}
+    for path in sorted(glob.glob(os.path.join(powercap_dir, "intel-rapl:*"))):
+        try:
+            name = _read_name(path)
+            _read_int(os.path.join(path, "energy_uj"))
+        except (OSError, ValueError):
+            continue
+        depth = os.path.basename(path).count(":")
+        if depth == 1 and name.startswith("package"):
+            domains["cpu"].append(path)
+        elif depth == 2 and name == "dram":
+            domains["ram"].append(path)
+    return domains
+
+
+def counter_delta(before: int, after: int, max_range: int) -> int:
+    """Counter difference, corrected for at most one wraparound at max_energy_range_uj."""
+    if after >= before:
+        return after - before
+    return after + max_range - before
+
+
+class RaplTracker:
+    """Start/stop energy tracker backed by RAPL counters, with the codecarbon tracker interface the
+    harness uses: start(), stop() and final_emissions_data after stop."""
+
+    def __init__(self, output_dir: str, output_file: str, project_name: str = "",
+                 powercap_dir: str = POWERCAP_DIR, save_to_file: bool = True):
+        self.output_path = os.path.join(output_dir, output_file)
+        self.project_name = project_name
+        self.save_to_file = save_to_file
+        self.domains = rapl_domains(powercap_dir)
+        self.max_ranges = {
+            path: _read_int(os.path.join(path, "max_energy_range_uj"))
+            for paths in self.domains.values() for path in paths
+        }
+        self.backend = "rapl" if self.domains["cpu"] else "cpu_time"
+        self.final_emissions_data = None
+        self._counters = {}
+        self._start_ns = 0
+        self._start_cpu_ns = 0
+
+    def _read_counters(self) -> dict[str, int]:
+        return {path: _read_int(os.path.join(path, "energy_uj")) for path in self.max_ranges}
+
+    def start(self):
+        self._start_cpu_ns = time.process_time_ns()
+        self._counters = self._read_counters()
+        self._start_ns = time.perf_counter_ns()
+
+    def stop(self):
+        duration_ns = time.perf_counter_ns() - self._start_ns
+        counters = self._read_counters()
+        cpu_ns = time.process_time_ns() - self._start_cpu_ns
+        duration = duration_ns / 1e9
+
+        if self.backend == "rapl":
+            energy_uj = {
+                kind: sum(
+                    counter_delta(self._counters[path], counters[path], self.max_ranges[path]) for path in paths
+                )
+                for kind, paths in self.domains.items()
+            }
+        else:
+            energy_uj = {"cpu": cpu_ns / 1e9 * FALLBACK_WATTS_PER_CORE * 1e6, "ram": 0.0}
+
+        cpu_energy = energy_uj["cpu"] / MICROJOULES_PER_KWH
+        ram_energy = energy_uj["ram"] / MICROJOULES_PER_KWH
+        self.final_emissions_data = SimpleNamespace(
+            duration=duration,
+            cpu_power=energy_uj["cpu"] / 1e6 / duration if duration else 0.0,
+            ram_power=energy_uj["ram"] / 1e6 / duration if duration else 0.0,
+            cpu_energy=cpu_energy,
+            ram_energy=ram_energy,
+            energy_consumed=cpu_energy + ram_energy,
+        )
+        if self.save_to_file:
+            append_rows(self.output_path, [self.row()])
+
+    def row(self) -> dict:
+        """Result row with the energy/duration columns codecarbon writes and csv_formatter.py reads."""
+        data = self.final_emissions_data
+        return {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "project_name": self.project_name,
+            "duration": data.duration,
+            "cpu_power": data.cpu_power,
+            "ram_power": data.ram_power,
+            "cpu_energy": data.cpu_energy,
+            "ram_energy": data.ram_energy,
+            "energy_consumed": data.energy_consumed,
+            "energy_backend": self.backend,
+        }
+
+
+def append_rows(path: str, rows: list[dict]):
+    """Append rows to a results CSV, reusing the existing header (e.g. one written by codecarbon).
+
+    A codecarbon header has no energy_backend column, every row in it is taken to be codecarbon's; rows from
+    another backend get their backend appended to project_name instead, so they can't be mistaken for those.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, newline="") as f:
+            fieldnames = next(csv.reader(f))
+        write_header = False
+    else:
+        fieldnames = list(rows[0])
+        write_header = True
+    if "energy_backend" not in fieldnames:
+        rows = [
+            {**row, "project_name": f"{row.get('project_name', '')}_{row['energy_backend']}"}
+            if row.get("energy_backend", "codecarbon") != "codecarbon" else row
+            for row in rows
+        ]
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore", restval="")
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def create_tracker(output_dir: str, output_file: str, project_name: str, backend: str = ENERGY_BACKEND,
+                   tracking_mode: str = "process"):
+    """Energy tracker for one operation from the configured backend."""
+    if backend == "rapl":
+        return RaplTracker(output_dir=output_dir, output_file=output_file, project_name=project_name)
+    if backend == "codecarbon":
+        return EmissionsTracker(
+            tracking_mode=tracking_mode,
+            output_dir=output_dir,
+            output_file=output_file,
+            measure_power_secs=1.0,
+            project_name=project_name
+        )
+    raise ValueError(f"Unknown ENERGY_BACKEND {backend!r}, expected 'codecarbon' or 'rapl'")
+
+
+class SessionTask:
+    """One named operation measured inside a TrackerSession, with the start/stop/final_emissions_data
+    interface of a standalone tracker."""
+
+    def __init__(self, session: "TrackerSession", output_file: str):
+        self.session = session
+        self.output_file = output_file
+        self.final_emissions_data = None
+
+    def start(self):
+        self.session.start_task(self.output_file)
+
+    def stop(self):
+        self.final_emissions_data = self.session.stop_task(self.output_file)
+        return self.final_emissions_data
+
+
+class TrackerSession:
+    """Energy measurement for every operation of one tracker process.
+
+    In shared mode a single tracker is created on first use and each operation is a task on it (codecarbon's
+    start_task/stop_task, or a reused RaplTracker); task rows are buffered and written with one append per
+    results file on close(), keeping one <operation>.csv per operation. In per_operation mode task() returns
+    a standalone tracker and close() has nothing to flush.
+    """
+
+    def __init__(self, output_dir: str, project_name: str, backend: str = ENERGY_BACKEND,
+                 mode: str = TRACKER_SESSION):
+        if mode not in ("shared", "per_operation"):
+            raise ValueError(f"Unknown TRACKER_SESSION {mode!r}, expected 'shared' or 'per_operation'")
+        self.output_dir = output_dir
+        self.project_name = project_name
+        self.backend = backend
+        self.mode = mode
+        self.tracker = None
+        self.rows: dict[str, list[dict]] = {}
+
+    def task(self, output_file: str):
+        if self.mode == "per_operation":
+            return create_tracker(self.output_dir, output_file, self.project_name, self.backend)
+        if self.tracker is None:
+            self.tracker = self._create_shared_tracker()
+        return SessionTask(self, output_file)
+
+    def _create_shared_tracker(self):
+        if self.backend == "rapl":
+            return RaplTracker(self.output_dir, "", self.project_name, save_to_file=False)
+        if self.backend == "codecarbon":
+            return EmissionsTracker(
+                tracking_mode="process",
+                output_dir=self.output_dir,
+                measure_power_secs=1.0,
+                project_name=self.project_name,
+                save_to_file=False
+            )
+        raise ValueError(f"Unknown ENERGY_BACKEND {self.backend!r}, expected 'codecarbon' or 'rapl'")
+
+    def start_task(self, task_name: str):
+        if self.backend == "rapl":
+            self.tracker.start()
+        else:
+            self.tracker.start_task(task_name)
+
+    def stop_task(self, task_name: str):
+        if self.backend == "rapl":
+            self.tracker.stop()
+            data = self.tracker.final_emissions_data
+            row = self.tracker.row()
+        else:
+            data = self.tracker.stop_task(task_name)
+            row = {**vars(data), "energy_backend": "codecarbon"}
+        self.rows.setdefault(task_name, []).append(row)
+        return data
+
+    def flush(self):
+        for output_file, rows in self.rows.items():
+            append_rows(os.path.join(self.output_dir, output_file), rows)
+        self.rows = {}
+
+    def close(self):
+        if self.tracker is not None and self.backend == "codecarbon":
+            self.tracker.stop()
+        self.flush()
@@ -0,0 +1,288 @@
+import os
+import csv
+import time
+from contextlib import contextmanager, asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+
+from src.data_access.db_config.latency import record_call
+from src.data_access.db_config.query_stats import call_window
+from src.benchmark.profiler import SamplingProfiler
+from src.benchmark.memory import MEMORY_COLUMNS, MemoryProbe
+from src.benchmark.postgres_stats import BACKEND_COLUMNS, BackendProbe
+
+# Runs a tracked operation K times inside one tracker window, after optional warmup iterations,
+# so sub-millisecond operations produce a measurable signal. Each iteration of a writing operation runs inside
+# a savepoint that is rolled back afterwards, so every iteration sees the same data; the enclosing transaction
+# is rolled back by the connection decorator (commit=False) once the operation is done. Read-only operations
+# skip the savepoint. The time spent opening and rolling back the savepoints (or resetting the session) is
+# recorded as isolation_total and its share of the window's energy is left out of energy_consumed_per_iteration.
+# Operations that isolate their own calls (mix steps) report that time through timed_isolation/timed_reset.
+
+HARNESS_ITERATIONS = int(os.getenv("HARNESS_ITERATIONS", 1))
+HARNESS_WARMUP = int(os.getenv("HARNESS_WARMUP", 0))
+# "savepoint" rolls every iteration back, "none" lets iterations see each other's changes
+HARNESS_ISOLATION = os.getenv("HARNESS_ISOLATION", "savepoint").lower()
+
+if HARNESS_ISOLATION not in ("savepoint", "none"):
+    raise ValueError(f"Unknown HARNESS_ISOLATION '{HARNESS_ISOLATION}', expected 'savepoint' or 'none'")
+
+# isolation time reported by the running operation itself, [ns] cell set by measure_operation
+_operation_isolation_ns = ContextVar("harness_operation_isolation_ns", default=None)
+
+SUMMARY_COLUMNS = [
+    "timestamp",
+    "project_name",
+    "iterations",
+    "warmup",
+    "isolation",
+    "energy_consumed_total",
+    "energy_consumed_per_iteration",
+    "energy_consumed_isolation",
+    "cpu_energy_total",
+    "ram_energy_total",
+    "latency_total",
+    "latency_mean",
+    "latency_p50",
+    "latency_p95",
+    "latency_p99",
+    "latency_min",
+    "latency_max",
+    "isolation_total",
+    *MEMORY_COLUMNS,
+    *BACKEND_COLUMNS,
+]
+
+
+def _add_isolation_ns(elapsed_ns: int):
+    cell = _operation_isolation_ns.get()
+    if cell is not None:
+        cell[0] += elapsed_ns
+
+
+@contextmanager
+def timed_isolation(scope):
+    """Enter an isolation context manager inside a measured operation; the time spent entering and leaving it
+    is moved from the iteration's latency to isolation_total."""
+    entering = time.perf_counter_ns()
+    with scope:
+        entered = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            leaving = time.perf_counter_ns()
+    _add_isolation_ns(entered - entering + time.perf_counter_ns() - leaving)
+
+
+def timed_reset(reset):
+    """Run a reset (e.g. session.expunge_all) inside a measured operation, counted like timed_isolation."""
+    start = time.perf_counter_ns()
+    reset()
+    _add_isolation_ns(time.perf_counter_ns() - start)
+
+
+def check_isolation(read_only: bool, iterations: int = HARNESS_ITERATIONS, warmup: int = HARNESS_WARMUP):
+    """Refuse to repeat a writing operation without savepoints: its iterations would collide with each other's
+    rows (unique emails, re-inserted bulk records) or turn into no-op inserts."""
+    if HARNESS_ISOLATION == "none" and not read_only and iterations + warmup > 1:
+        raise ValueError(
+            "HARNESS_ISOLATION=none only works for read-only operations when they run more than once "
+            f"(HARNESS_ITERATIONS={iterations}, HARNESS_WARMUP={warmup}), use 'savepoint' for writes"
+        )
+
+
+@contextmanager
+def sql_savepoint(cursor):
+    """Roll every change made inside the block back to a savepoint (SQL)."""
+    cursor.execute("SAVEPOINT harness_iteration;")
+    try:
+        yield
+    finally:
+        cursor.execute("ROLLBACK TO SAVEPOINT harness_iteration;")
+        cursor.execute("RELEASE SAVEPOINT harness_iteration;")
+
+
+@contextmanager
+def orm_savepoint(session):
+    """Roll every change made inside the block back to a savepoint and clear the identity map (ORM),
+    so each iteration starts like a fresh session."""
+    nested = session.begin_nested()
+    try:
+        yield
+    finally:
+        nested.rollback()
+        session.expunge_all()
+
+
+@asynccontextmanager
+async def async_sql_savepoint(conn):
+    """Roll every change made inside the block back to a savepoint (async SQL, asyncpg nested transaction)."""
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        yield
+    finally:
+        await transaction.rollback()
+
+
+@asynccontextmanager
+async def async_orm_savepoint(session):
+    """Roll every change made inside the block back to a savepoint and clear the identity map (async ORM)."""
+    nested = await session.begin_nested()
+    try:
+        yield
+    finally:
+        await nested.rollback()
+        session.expunge_all()
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies_ns: list[int], energy: dict, iterations: int, isolation_ns: int = 0,
+              window_ns: int = 0) -> dict:
+    """Latency totals/percentiles in seconds and energy totals/per-iteration in kWh.
+
+    `isolation_ns` of the `window_ns` long tracked window went to the isolation scopes; that share of the energy
+    is reported as energy_consumed_isolation and not counted per iteration.
+    """
+    latencies = sorted(ns / 1e9 for ns in latencies_ns)
+    energy_total = energy.get("energy_consumed", 0.0)
+    energy_isolation = energy_total * min(isolation_ns / window_ns, 1.0) if window_ns else 0.0
+    return {
+        "energy_consumed_total": energy_total,
+        "energy_consumed_per_iteration": (energy_total - energy_isolation) / iterations if iterations else 0.0,
+        "energy_consumed_isolation": energy_isolation,
+        "cpu_energy_total": energy.get("cpu_energy", 0.0),
+        "ram_energy_total": energy.get("ram_energy", 0.0),
+        "latency_total": sum(latencies),
+        "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_min": latencies[0] if latencies else 0.0,
+        "latency_max": latencies[-1] if latencies else 0.0,
+        "isolation_total": isolation_ns / 1e9,
+    }
+
+
+def tracker_energy(tracker) -> dict:
+    """Energy totals (kWh) of a stopped codecarbon tracker."""
+    data = getattr(tracker, "final_emissions_data", None)
+    if data is None:
+        return {}
+    return {
+        "energy_consumed": data.energy_consumed,
+        "cpu_energy": data.cpu_energy,
+        "ram_energy": data.ram_energy,
+    }
+
+
+def write_summary(path: str, row: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = []
+    rewrite = not os.path.exists(path)
+    if not rewrite:
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames != SUMMARY_COLUMNS:
+                # summary written before columns were added: rewrite it with the current header
+                rows = list(reader)
+                rewrite = True
+    if rewrite:
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS, extrasaction="ignore", restval="")
+            writer.writeheader()
+            writer.writerows(rows)
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS, restval="")
+        writer.writerow(row)
+
+
+def measure_operation(tracker, operation, isolation=None, summary_path: str | None = None,
+                      project_name: str = "", iterations: int = HARNESS_ITERATIONS,
+                      warmup: int = HARNESS_WARMUP, profile_path: str | None = None,
+                      backend_pid: int | None = None, read_only: bool = False, reset=None) -> dict:
+    """Run `operation` warmup + iterations times, tracking only the measured iterations.
+
+    `isolation` is a zero-argument callable returning a context manager (e.g. a savepoint) that wraps
+    each iteration; it is skipped for read-only operations, with HARNESS_ISOLATION=none and for a single
+    un-warmed iteration, so the default matches one plain call. `reset` runs after each iteration instead when
+    isolation is skipped, e.g. session.expunge_all so ORM reads don't hit the identity map of the previous one.
+    With `profile_path`, the measured iterations are sampled and their stacks added to that collapsed-stack file.
+    `backend_pid` is the postgres backend of the operation's connection, whose CPU and I/O are recorded too.
+    """
+    if isolation is not None:
+        check_isolation(read_only, iterations, warmup)
+    isolated = (isolation is not None and HARNESS_ISOLATION == "savepoint" and not read_only
+                and iterations + warmup > 1)
+    scope = isolation if isolated else nullcontext
+    reset = reset if not isolated and iterations + warmup > 1 else None
+
+    for _ in range(warmup):
+        with scope():
+            operation()
+        if reset:
+            reset()
+
+    latencies_ns = []
+    isolation_ns = 0
+    profiler = SamplingProfiler() if profile_path else None
+    memory = MemoryProbe()
+    backend = BackendProbe(backend_pid)
+    result = None
+    memory.start()
+    tracker.start()
+    backend.start()
+    operation_isolation_ns = [0]
+    token = _operation_isolation_ns.set(operation_isolation_ns)
+    window_start = time.perf_counter_ns()
+    try:
+        with profiler or nullcontext():
+            for _ in range(iterations):
+                # the isolation cost is the time spent entering and leaving the scope, plus the reset, plus
+                # what the operation reports for isolating its own calls
+                operation_isolation_ns[0] = 0
+                entering = time.perf_counter_ns()
+                with scope():
+                    entered = time.perf_counter_ns()
+                    with call_window():
+                        start = time.perf_counter_ns()
+                        result = operation()
+                        latencies_ns.append(time.perf_counter_ns() - start - operation_isolation_ns[0])
+                    leaving = time.perf_counter_ns()
+                if reset:
+                    reset()
+                isolation_ns += entered - entering + time.perf_counter_ns() - leaving + operation_isolation_ns[0]
+                record_call(latencies_ns[-1])
+    finally:
+        window_ns = time.perf_counter_ns() - window_start
+        _operation_isolation_ns.reset(token)
+        backend_columns = backend.stop()
+        tracker.stop()
+    # the last result is kept alive until here, so its objects count towards the footprint
+    memory_columns = memory.stop()
+    del result
+    if profiler:
+        profiler.write(profile_path)
+
+    summary = {
+        **summarize(latencies_ns, tracker_energy(tracker), iterations, isolation_ns, window_ns),
+        **memory_columns,
+        **backend_columns,
+    }
+    if summary_path:
+        write_summary(summary_path, {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "project_name": project_name,
+            "iterations": iterations,
+            "warmup": warmup,
+            "isolation": HARNESS_ISOLATION if isolated else "none",
+            **summary,
+        })
+    return summary
@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.benchmark.energy import create_tracker, append_rows
+from src.benchmark.harness import percentile
+from src.data_access.db_config.latency import operation_scope, record_call, export_histograms, reset
+
+# Multi-client load generation: N clients (threads or processes, one connection each) run one registry
+# operation in a loop for a fixed duration or operation count, for every client count in a sweep.
+# Each level reports throughput, tail latency and energy per operation, and the sweep reports where
+# throughput stops scaling with more clients. Latencies of every level also go into the latency histograms,
+# as operation "<operation>_<clients>_clients", exported to results/<size>/load/latency/ per stack.
+
+STACK_MODULES = {
+    "orm": "src.orm_experiments.orm_energy_tracker_v2",
+    "sql": "src.sql_experiments.sql_energy_tracker_v2",
+}
+MAX_CLIENTS = 64
+# a level whose throughput gain over the previous level is below this fraction counts as saturated
+SATURATION_GAIN = float(os.getenv("LOAD_SATURATION_GAIN", 0.10))
+# seconds the clients wait for each other (connections, spawned processes) before the measured window
+START_TIMEOUT = float(os.getenv("LOAD_START_TIMEOUT", 120))
+
+RESULT_COLUMNS = [
+    "timestamp",
+    "project_name",
+    "stack",
+    "operation",
+    "mode",
+    "clients",
+    "duration",
+    "operations",
+    "ops_per_sec",
+    "latency_p50",
+    "latency_p95",
+    "latency_p99",
+    "latency_max",
+    "energy_consumed",
+    "energy_per_operation_joules",
+    "throughput_gain",
+    "saturated",
+]
+
+_start_barrier = None
+
+
+def load_stack(name: str):
+    return importlib.import_module(STACK_MODULES[name]).stack
+
+
+def init_client(barrier):
+    global _start_barrier
+    _start_barrier = barrier
+
+
+def run_client(stack_name: str, operation: str, params: dict, duration: float | None,
+               max_operations: int | None, level_name: str) -> list[int]:
+    """Latencies (ns) of one client running operation until the duration or operation count is reached.
+
+    Each call runs inside the stack's isolation (a savepoint), so writes are rolled back and row locks are
+    released after every operation instead of being held for the whole run. A failing client breaks the start
+    barrier, so the other clients and the level don't wait for it until START_TIMEOUT.
+    """
+    stack = load_stack(stack_name)
+    latencies_ns = []
+
+    @stack.connection(commit=False)
+    def client(**scope):
+        call = stack.operations[operation].bind(scope, params)
+        _start_barrier.wait(timeout=START_TIMEOUT)
+        deadline = time.perf_counter() + duration if duration else None
+        while True:
+            if max_operations is not None and len(latencies_ns) >= max_operations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            with stack.isolation(**scope):
+                start = time.perf_counter_ns()
+                call()
+                latencies_ns.append(time.perf_counter_ns() - start)
+
+    # the calls are recorded by run_level, which also sees the latencies of client processes
+    with operation_scope(level_name):
+        try:
+            client()
+        except BaseException:
+            _start_barrier.abort()
+            raise
+    return latencies_ns
+
+
+def split_operations(total: int | None, clients: int) -> list[int | None]:
+    if total is None:
+        return [None] * clients
+    return [total // clients + (1 if i < total % clients else 0) for i in range(clients)]
+
+
+def run_level(stack_name: str, operation: str, params: dict, clients: int, mode: str, duration: float | None,
+              total_operations: int | None, output_dir: str, project_name: str) -> dict:
+    """Run one client count and return its result row."""
+    if mode == "processes":
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(clients + 1)
+        executor = ProcessPoolExecutor(max_workers=clients, mp_context=context,
+                                       initializer=init_client, initargs=(barrier,))
+    else:
+        barrier = threading.Barrier(clients + 1)
+        executor = ThreadPoolExecutor(max_workers=clients, initializer=init_client, initargs=(barrier,))
+
+    # codecarbon measures the whole machine here: client processes and postgres backends all count
+    tracker = create_tracker(output_dir, f"{stack_name}_{operation}_energy.csv", project_name,
+                             tracking_mode="machine")
+    level_name = f"{operation}_{clients}_clients"
+    with executor:
+        futures = [
+            executor.submit(run_client, stack_name, operation, params, duration, count, level_name)
+            for count in split_operations(total_operations, clients)
+        ]
+        try:
+            barrier.wait(timeout=START_TIMEOUT)
+        except threading.BrokenBarrierError:
+            # raise the error of the client that broke the barrier rather than the barrier's
+            errors = [future.exception() for future in futures]
+            errors = [e for e in errors if e is not None and not isinstance(e, threading.BrokenBarrierError)]
+            if errors:
+                raise errors[0]
+            raise
+        tracker.start()
+        start = time.perf_counter()
+        try:
+            latencies_ns = [latency for future in futures for latency in future.result()]
+        finally:
+            elapsed = time.perf_counter() - start
+            tracker.stop()
+
+    with operation_scope(level_name):
+        for latency_ns in latencies_ns:
+            record_call(latency_ns)
+
+    latencies = sorted(ns / 1e9 for ns in latencies_ns)
+    data = getattr(tracker, "final_emissions_data", None)
+    energy = data.energy_consumed if data is not None else 0.0
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "project_name": project_name,
+        "stack": stack_name,
+        "operation": operation,
+        "mode": mode,
+        "clients": clients,
+        "duration": elapsed,
+        "operations": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": latencies[-1] if latencies else 0.0,
+        "energy_consumed": energy,
+        "energy_per_operation_joules": energy * 3_600_000 / len(latencies) if latencies else 0.0,
+    }
+
+
+def mark_saturation(rows: list[dict]) -> int | None:
+    """Fill throughput_gain/saturated and return the client count where throughput stopped scaling."""
+    saturated_at = None
+    previous = None
+    for row in rows:
+        gain = (row["ops_per_sec"] - previous) / previous if previous else None
+        row["throughput_gain"] = round(gain, 4) if gain is not None else ""
+        if saturated_at is None and gain is not None and gain < SATURATION_GAIN:
+            saturated_at = row["clients"]
+        row["saturated"] = saturated_at is not None
+        previous = row["ops_per_sec"]
+    return saturated_at
+
+
+def parse_clients(spec: str) -> list[int]:
+    clients = sorted({int(n) for n in spec.split(",") if n})
+    if not clients or clients[0] < 1 or clients[-1] > MAX_CLIENTS:
+        raise argparse.ArgumentTypeError(f"client counts must be between 1 and {MAX_CLIENTS}")
+    return clients
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive ORM and SQL repository operations from concurrent clients")
+    parser.add_argument("--stack", nargs="+", choices=list(STACK_MODULES), default=list(STACK_MODULES))
+    parser.add_argument("--operation", default="get_customer_by_id", help="Operation name from the stack registry")
+    parser.add_argument("--params", type=json.loads, default={}, help='Operation params as JSON, e.g. \'{"n": 100}\'')
+    parser.add_argument("--clients", type=parse_clients, default=parse_clients("1,2,4,8,16,32,64"),
+                        help=f"Comma separated client counts to sweep (1-{MAX_CLIENTS})")
+    parser.add_argument("--mode", choices=["threads", "processes"], default="threads")
+    limit_group = parser.add_mutually_exclusive_group()
+    limit_group.add_argument("--duration", type=float, help="Seconds each level runs (default 10)")
+    limit_group.add_argument("--operations", type=int, help="Total operations per level, split over the clients")
+    args = parser.parse_args()
+    duration = args.duration if args.duration or args.operations else 10.0
+
+    # every thread holds its own connection for the whole level
+    os.environ.setdefault("SQL_POOL_MAX_SIZE", str(args.clients[-1]))
+    os.environ.setdefault("ORM_POOL_SIZE", str(args.clients[-1]))
+
+    record_count = int(os.environ.get("RECORD_COUNT", 1000))
+    output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "results", str(record_count), "load")
+
+    for stack_name in args.stack:
+        stack = load_stack(stack_name)
+        if args.operation not in stack.operations:
+            parser.error(
+                f"unknown {stack_name} operation {args.operation!r}, expected one of {sorted(stack.operations)}"
+            )
+        rows = [
+            run_level(stack_name, args.operation, args.params, clients, args.mode, duration, args.operations,
+                      output_dir, stack.project_name)
+            for clients in args.clients
+        ]
+        saturated_at = mark_saturation(rows)
+        append_rows(os.path.join(output_dir, f"{stack_name}_{args.operation}_load_{record_count}.csv"),
+                    [{column: row.get(column, "") for column in RESULT_COLUMNS} for row in rows])
+        export_histograms(os.path.join(output_dir, "latency"),
+                          f"{stack_name}_{args.operation}_load_latency_{record_count}", stack.project_name)
+        reset()
+
+        print(f"\n{stack_name} {args.operation} ({args.mode})")
+        print(f"{'clients':>8} {'ops/sec':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'J/op':>10}")
+        for row in rows:
+            print(f"{row['clients']:>8} {row['ops_per_sec']:>10.1f} {row['latency_p50'] * 1000:>9.3f} "
+                  f"{row['latency_p95'] * 1000:>9.3f} {row['latency_p99'] * 1000:>9.3f} "
+                  f"{row['energy_per_operation_joules']:>10.4g}")
+        if saturated_at is not None:
+            print(f"Throughput stops scaling at {saturated_at} clients (gain < {SATURATION_GAIN:.0%})")
+        else:
+            print("Throughput still scaling at the largest client count")
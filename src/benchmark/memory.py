@@ -0,0 +1,120 @@
+import gc
+import os
+import tracemalloc
+from collections import Counter
+
+# Memory footprint of one measured operation, added to its harness summary row:
+#   rss_delta_kb: resident set size after the operation (its last result still alive) minus before,
+#   peak_rss_kb: highest RSS during the operation above the RSS before it, after resetting the kernel's
+#                high-water mark (Linux only),
+#   heap_peak_kb: tracemalloc peak of Python allocations above the starting heap,
+#   objects_total / objects_by_type: objects created by the operation and alive at its end, by type.
+# "rss" only reads /proc/self/status around the window. "full" also traces allocations, which slows every
+# Python allocation inside the window, and counts objects afterwards, which walks the whole heap.
+
+MEMORY_STATS = os.getenv("MEMORY_STATS", "rss").lower()
+# number of types listed in objects_by_type
+MEMORY_TOP_TYPES = int(os.getenv("MEMORY_TOP_TYPES", 10))
+
+if MEMORY_STATS not in ("off", "rss", "full"):
+    raise ValueError(f"Unknown MEMORY_STATS '{MEMORY_STATS}', expected 'off', 'rss' or 'full'")
+
+MEMORY_COLUMNS = ["heap_peak_kb", "rss_delta_kb", "peak_rss_kb", "objects_total", "objects_by_type"]
+
+
+def read_status_kb(path: str = "/proc/self/status") -> dict[str, int]:
+    """VmRSS/VmHWM and the other kB fields of /proc/self/status, empty where it doesn't exist."""
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+    status = {}
+    for line in lines:
+        key, _, value = line.partition(":")
+        parts = value.split()
+        if len(parts) == 2 and parts[1] == "kB":
+            status[key] = int(parts[0])
+    return status
+
+
+def reset_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS (Linux 4.0+), so it measures the peak of what follows."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _type_name(obj) -> str:
+    cls = type(obj)
+    return cls.__name__ if cls.__module__ == "builtins" else f"{cls.__module__}.{cls.__qualname__}"
+
+
+def count_new_objects(baseline_ids: set[int]) -> Counter:
+    """Objects the collector tracks that weren't there at baseline, plus the untracked values they hold
+    (str, int, Decimal, ...), which gc.get_objects() doesn't list."""
+    gc.collect()
+    counts = Counter()
+    seen = set()
+    own = {id(baseline_ids), id(counts), id(seen)}
+    for obj in gc.get_objects():
+        if id(obj) in baseline_ids or id(obj) in own:
+            continue
+        counts[_type_name(obj)] += 1
+        for referent in gc.get_referents(obj):
+            if not gc.is_tracked(referent) and id(referent) not in seen:
+                seen.add(id(referent))
+                counts[_type_name(referent)] += 1
+    return counts
+
+
+class MemoryProbe:
+    """Brackets the measured window of an operation, see MEMORY_STATS."""
+
+    def __init__(self, mode: str = MEMORY_STATS):
+        self.mode = mode
+        self.columns = {}
+        self._baseline_ids = set()
+        self._rss_before = None
+        self._peak_reset = False
+        self._started_tracing = False
+        self._heap_before = 0
+
+    def start(self):
+        if self.mode == "off":
+            return
+        if self.mode == "full":
+            gc.collect()
+            self._baseline_ids = {id(obj) for obj in gc.get_objects()}
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._heap_before = tracemalloc.get_traced_memory()[0]
+        self._rss_before = read_status_kb().get("VmRSS")
+        self._peak_reset = reset_peak_rss()
+
+    def stop(self):
+        """Read the footprint, call while the operation's result is still referenced."""
+        if self.mode == "off":
+            return self.columns
+        status = read_status_kb()
+        if self._rss_before is not None and "VmRSS" in status:
+            self.columns["rss_delta_kb"] = status["VmRSS"] - self._rss_before
+        if self._peak_reset and self._rss_before is not None and "VmHWM" in status:
+            self.columns["peak_rss_kb"] = max(status["VmHWM"] - self._rss_before, 0)
+        if self.mode == "full":
+            heap_peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+            self.columns["heap_peak_kb"] = max(heap_peak - self._heap_before, 0) // 1024
+            counts = count_new_objects(self._baseline_ids)
+            self._baseline_ids = set()
+            self.columns["objects_total"] = sum(counts.values())
+            self.columns["objects_by_type"] = ";".join(
+                f"{name}:{count}" for name, count in counts.most_common(MEMORY_TOP_TYPES)
+            )
+        return self.columns
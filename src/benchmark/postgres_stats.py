@@ -0,0 +1,132 @@
+import os
+import time
+
+# Server-side cost of one measured operation. codecarbon's process mode only sees the Python client, so the
+# harness also reads the CPU time and I/O counters (/proc/<pid>/io) of the postgres backend serving the tracker's
+# connection, found with pg_backend_pid(), before and after the window. backend_cpu_s comes from the nanosecond
+# run time in /proc/<pid>/schedstat; the user/system split from /proc/<pid>/stat only has clock-tick (usually 10 ms)
+# resolution. Next to it, client_cpu_s is the CPU time of the tracker process over the same window.
+#
+# Only works when postgres runs in the same PID namespace as the tracker (not in a container with its own
+# namespace unless its /proc is mounted at BACKEND_PROC_DIR); the process is checked to be postgres first.
+# /proc/<pid>/io is only readable by the postgres user or root, otherwise the I/O columns stay empty.
+# CPU of parallel query workers is not included.
+
+BACKEND_STATS = os.getenv("BACKEND_STATS", "true").lower() == "true"
+BACKEND_PROC_DIR = os.getenv("BACKEND_PROC_DIR", "/proc")
+
+BACKEND_COLUMNS = [
+    "client_cpu_s",
+    "backend_pid",
+    "backend_cpu_s",
+    "backend_user_s",
+    "backend_system_s",
+    "backend_read_bytes",
+    "backend_write_bytes",
+    "backend_rchar",
+    "backend_wchar",
+]
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def sql_backend_pid(cursor) -> int | None:
+    """PID of the backend serving a psycopg2 cursor's connection."""
+    if not BACKEND_STATS:
+        return None
+    cursor.execute("SELECT pg_backend_pid();")
+    return cursor.fetchone()[0]
+
+
+def orm_backend_pid(session) -> int | None:
+    """PID of the backend serving a session's connection."""
+    if not BACKEND_STATS:
+        return None
+    return session.connection().exec_driver_sql("SELECT pg_backend_pid();").scalar()
+
+
+def is_postgres(pid: int, proc_dir: str = BACKEND_PROC_DIR) -> bool:
+    try:
+        with open(os.path.join(proc_dir, str(pid), "cmdline"), "rb") as f:
+            return b"postgres" in f.read()
+    except OSError:
+        return False
+
+
+def read_cpu_seconds(pid: int, proc_dir: str = BACKEND_PROC_DIR) -> tuple[float, float] | None:
+    """User and system CPU seconds of a process, from fields 14 and 15 of /proc/<pid>/stat."""
+    try:
+        with open(os.path.join(proc_dir, str(pid), "stat")) as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # the command name in field 2 may contain spaces, the fields after it don't
+    fields = stat[stat.rindex(")") + 2:].split()
+    return int(fields[11]) / _CLOCK_TICKS, int(fields[12]) / _CLOCK_TICKS
+
+
+def read_cpu_ns(pid: int, proc_dir: str = BACKEND_PROC_DIR) -> int | None:
+    """Time a process has spent on CPU in nanoseconds, the first field of /proc/<pid>/schedstat."""
+    try:
+        with open(os.path.join(proc_dir, str(pid), "schedstat")) as f:
+            return int(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_io_counters(pid: int, proc_dir: str = BACKEND_PROC_DIR) -> dict[str, int]:
+    """rchar/wchar/read_bytes/write_bytes of /proc/<pid>/io, empty when not permitted."""
+    try:
+        with open(os.path.join(proc_dir, str(pid), "io")) as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+    counters = {}
+    for line in lines:
+        key, _, value = line.partition(":")
+        counters[key.strip()] = int(value)
+    return counters
+
+
+class BackendProbe:
+    """Brackets the measured window of an operation with reads of the client's and the backend's counters."""
+
+    def __init__(self, backend_pid: int | None, proc_dir: str = BACKEND_PROC_DIR, enabled: bool = BACKEND_STATS):
+        self.enabled = enabled
+        self.pid = backend_pid if enabled and backend_pid and is_postgres(backend_pid, proc_dir) else None
+        self.proc_dir = proc_dir
+        self._client_cpu = None
+        self._cpu = None
+        self._cpu_ns = None
+        self._io = {}
+
+    def start(self):
+        if not self.enabled:
+            return
+        if self.pid is not None:
+            self._cpu = read_cpu_seconds(self.pid, self.proc_dir)
+            self._cpu_ns = read_cpu_ns(self.pid, self.proc_dir)
+            self._io = read_io_counters(self.pid, self.proc_dir)
+        self._client_cpu = time.process_time()
+
+    def stop(self) -> dict:
+        if not self.enabled:
+            return {}
+        columns = {"client_cpu_s": time.process_time() - self._client_cpu}
+        if self.pid is None:
+            return columns
+        columns["backend_pid"] = self.pid
+        cpu = read_cpu_seconds(self.pid, self.proc_dir)
+        cpu_ns = read_cpu_ns(self.pid, self.proc_dir)
+        if self._cpu is not None and cpu is not None:
+            columns["backend_user_s"] = cpu[0] - self._cpu[0]
+            columns["backend_system_s"] = cpu[1] - self._cpu[1]
+            columns["backend_cpu_s"] = columns["backend_user_s"] + columns["backend_system_s"]
+        # without schedstat (kernels built without CONFIG_SCHED_INFO) the tick-resolution sum above stays
+        if self._cpu_ns is not None and cpu_ns is not None:
+            columns["backend_cpu_s"] = (cpu_ns - self._cpu_ns) / 1e9
+        io = read_io_counters(self.pid, self.proc_dir)
+        for key in ("read_bytes", "write_bytes", "rchar", "wchar"):
+            if key in self._io and key in io:
+                columns[f"backend_{key}"] = io[key] - self._io[key]
+        return columns
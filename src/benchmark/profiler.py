@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import signal
+import threading
+from collections import Counter
+from functools import lru_cache
+
+# Opt-in sampling profiler for the tracked window of an operation. A timer signal interrupts the main thread every
+# PROFILE_INTERVAL_MS and the handler records the interrupted Python stack; stacks are written in the collapsed
+# ("folded") format read by flamegraph.pl, speedscope and inferno: `root;caller;callee <samples>` per line.
+# The "cpu" clock (SIGPROF) only samples while the process is using CPU, so it shows where the energy goes;
+# "wall" (SIGALRM) also samples while waiting on the database. Outside the main thread, or without setitimer,
+# a sampler thread reads the stack through sys._current_frames instead (always wall clock). Timer signals are
+# delivered late or merged while the process is busy in C code, so every sample is weighted by the time since the
+# previous one (thread CPU time for "cpu", wall time otherwise) in units of the interval; the written counts are
+# those weights, rounded.
+
+PROFILE = os.getenv("PROFILE", "false").lower() == "true"
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 1.0))
+PROFILE_CLOCK = os.getenv("PROFILE_CLOCK", "cpu").lower()
+
+if PROFILE_CLOCK not in ("cpu", "wall"):
+    raise ValueError(f"Unknown PROFILE_CLOCK '{PROFILE_CLOCK}', expected 'cpu' or 'wall'")
+
+
+@lru_cache(maxsize=None)
+def _short_path(filename: str) -> str:
+    """Path relative to the longest sys.path entry containing it, e.g. sqlalchemy/orm/session.py."""
+    prefixes = [os.path.join(os.path.abspath(entry), "") for entry in sys.path if entry]
+    matches = [prefix for prefix in prefixes if filename.startswith(prefix)]
+    return filename[len(max(matches, key=len)):] if matches else filename
+
+
+@lru_cache(maxsize=None)
+def frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stack of the thread that starts it, use as a context manager around the code to profile."""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, clock: str = PROFILE_CLOCK):
+        self.interval = interval_ms / 1000
+        self.clock = clock
+        # leaf-first tuples of code objects -> weight in intervals, labelled only when written
+        self.samples = Counter()
+        self._clock = time.thread_time if clock == "cpu" else time.perf_counter
+        self._last = 0.0
+        self._timer = None
+        self._signum = None
+        self._previous_handler = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def _sample(self, frame):
+        now = self._clock()
+        weight = (now - self._last) / self.interval
+        self._last = now
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.samples[tuple(stack)] += weight
+
+    def _on_signal(self, signum, frame):
+        self._sample(frame)
+
+    def _run_sampler(self, thread_id: int):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                self._sample(frame)
+
+    def start(self):
+        if threading.current_thread() is threading.main_thread() and hasattr(signal, "setitimer"):
+            self._last = self._clock()
+            self._timer, self._signum = (
+                (signal.ITIMER_PROF, signal.SIGPROF) if self.clock == "cpu" else (signal.ITIMER_REAL, signal.SIGALRM)
+            )
+            self._previous_handler = signal.signal(self._signum, self._on_signal)
+            signal.setitimer(self._timer, self.interval, self.interval)
+        else:
+            # the sampler thread can't read the sampled thread's CPU time
+            self._clock = time.perf_counter
+            self._last = self._clock()
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run_sampler, args=(threading.get_ident(),), daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._timer is not None:
+            signal.setitimer(self._timer, 0)
+            signal.signal(self._signum, self._previous_handler)
+            self._timer = None
+        elif self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def collapsed(self) -> Counter:
+        stacks = Counter()
+        for codes, count in self.samples.items():
+            stacks[";".join(frame_label(code) for code in reversed(codes))] += count
+        return stacks
+
+    def write(self, path: str):
+        """Add the samples to the collapsed-stack file at path, merging with the stacks of earlier runs."""
+        stacks = Counter()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    if stack:
+                        stacks[stack] += int(count)
+        stacks.update(self.collapsed())
+        stacks = {stack: round(count) for stack, count in stacks.items() if round(count) > 0}
+        if not stacks:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
@@ -0,0 +1,186 @@
+import os
+import json
+import random
+import itertools
+from contextlib import nullcontext
+
+from src.data_access.db_config.latency import operation_scope
+from src.benchmark.harness import check_isolation, timed_isolation, timed_reset
+
+# Declarative workloads for the tracker scripts. A workload is a list of steps; each step names an
+# operation from a stack's registry (the same names for SQL and ORM) and its parameters:
+#
+#   {"operation": "create_customers_bulk", "params": {"batch_size": [10, 100, 1000]}}
+#
+# List-valued parameters expand into one tracked step per value (or per combination), and the values are
+# appended to the result file name, e.g. sql_create_customers_bulk_100_<records>.csv. A mix step runs a
+# seeded random sequence of weighted operations inside one tracked window:
+#
+#   {"name": "mix_read_80_write_20", "count": 1000, "seed": 42, "mix": [
+#       {"operation": "get_customer_by_id", "weight": 80},
+#       {"operation": "update_customer_email", "weight": 20}]}
+
+WORKLOAD_FILE = os.getenv("WORKLOAD_FILE")
+# comma separated step names to run (e.g. "get_customers,create_customers_bulk_100"), empty runs all
+WORKLOAD_OPERATIONS = [name for name in os.getenv("WORKLOAD_OPERATIONS", "").split(",") if name]
+
+bulk_batch_sizes = [int(n) for n in os.environ.get("BULK_BATCH_SIZES", "10,100,1000,10000").split(",")]
+lookup_batch_sizes = [int(n) for n in os.environ.get("LOOKUP_BATCH_SIZES", "1,10,100,1000").split(",")]
+stream_fetch_size = int(os.environ.get("STREAM_FETCH_SIZE", 2000))
+
+# the fixed CRUD benchmark both tracker scripts ran before workloads were configurable
+DEFAULT_WORKLOAD = [
+    {"operation": "create_customer"},
+    {"operation": "create_customers_bulk", "params": {"batch_size": bulk_batch_sizes}},
+    {"operation": "get_customers"},
+    {"operation": "stream_customers", "params": {"fetch_size": stream_fetch_size}},
+    {"operation": "get_customer_by_id"},
+    {"operation": "get_customers_by_ids", "params": {"n": lookup_batch_sizes}},
+    {"operation": "fetch_top_spending_customers", "params": {"limit": 10}},
+    {"operation": "update_customer_email"},
+    {"operation": "update_many_contract_types"},
+    {"operation": "delete_inactive_customers"},
+    {"operation": "delete_customer_by_id"},
+]
+
+
+class Operation:
+    """A repository call of one stack. `run(**scope, **args)` is the tracked call; `prepare(**scope, **params)`
+    runs before tracking starts and returns the run arguments (e.g. generated records or sampled ids).
+    `read_only` operations change nothing, so the harness runs them without a savepoint."""
+
+    def __init__(self, run, prepare=None, read_only: bool = False):
+        self.run = run
+        self.prepare = prepare
+        self.read_only = read_only
+
+    def bind(self, scope: dict, params: dict):
+        args = self.prepare(**scope, **params) if self.prepare else params
+        return lambda: self.run(**scope, **args)
+
+
+class Stack:
+    """Everything the engine needs from a tracker script: its connection decorator (which passes the
+    connection scope as keyword arguments), its track(output_file, operation, read_only, **scope), its registry,
+    isolation(**scope), a context manager that rolls back one operation's changes, and reset(**scope), which
+    clears client-side state between read-only calls (the ORM identity map)."""
+
+    def __init__(self, name: str, connection, track, operations: dict[str, Operation], isolation=None,
+                 project_name: str = "", reset=None):
+        self.name = name
+        self.connection = connection
+        self.track = track
+        self.operations = operations
+        self.isolation = isolation
+        self.project_name = project_name
+        self.reset = reset
+
+
+def require_count(values: list, n: int) -> list:
+    """values, which must be the n the step asked for: its result file is named after n."""
+    if len(values) < n:
+        raise ValueError(f"Step asks for {n} rows but only {len(values)} exist, seed more records or lower n")
+    return values
+
+
+def load_workload(path: str | None = WORKLOAD_FILE) -> list[dict]:
+    if not path:
+        return DEFAULT_WORKLOAD
+    with open(path) as f:
+        workload = json.load(f)
+    return workload["steps"] if isinstance(workload, dict) else workload
+
+
+def expand_step(step: dict) -> list[tuple[str, dict]]:
+    """(step name, scalar params) for every combination of a step's list-valued params."""
+    params = step.get("params", {})
+    grid = {key: value for key, value in params.items() if isinstance(value, list)}
+    base_name = step.get("name", step.get("operation"))
+    if not grid:
+        return [(base_name, params)]
+    expanded = []
+    for values in itertools.product(*grid.values()):
+        combination = {**params, **dict(zip(grid, values))}
+        expanded.append(("_".join([base_name, *(str(value) for value in values)]), combination))
+    return expanded
+
+
+def step_operations(step: dict) -> list[str]:
+    """Names of the operations a step runs: its operation, or the entries of its mix."""
+    return [entry["operation"] for entry in step["mix"]] if "mix" in step else [step["operation"]]
+
+
+def mix_sequence(step: dict, calls: list) -> list:
+    """Seeded, weighted sequence of a mix step's calls, given one call per entry of step["mix"]."""
+    weights = [entry.get("weight", 1) for entry in step["mix"]]
+    return random.Random(step.get("seed", 42)).choices(calls, weights=weights, k=step.get("count", 100))
+
+
+def selected_steps(workload: list[dict], only: list[str]) -> list[tuple[dict, str, dict]]:
+    """(step, name, params) of every expanded step to run, in order: all of them, or only the named ones."""
+    return [
+        (step, name, params)
+        for step in workload
+        for name, params in expand_step(step)
+        if not only or name in only or step.get("operation") in only
+    ]
+
+
+def step_read_only(stack: Stack, step: dict) -> bool:
+    return all(stack.operations[operation].read_only for operation in step_operations(step))
+
+
+def validate_workload(stack: Stack, workload: list[dict]):
+    for step in workload:
+        names = step_operations(step)
+        unknown = [name for name in names if name not in stack.operations]
+        if unknown:
+            raise ValueError(f"Unknown {stack.name} operation(s) {unknown}, expected one of {sorted(stack.operations)}")
+        if "mix" in step and "name" not in step:
+            raise ValueError(f"Mix step {step} needs a name for its result file")
+
+
+def run_step(stack: Stack, step: dict, name: str, params: dict, record_count: int):
+    output_file = f"{stack.name}_{name}_{record_count}.csv"
+    read_only = step_read_only(stack, step)
+
+    @stack.connection(commit=False)
+    def run(**scope):
+        if "mix" not in step:
+            operation = stack.operations[step["operation"]].bind(scope, params)
+        else:
+            calls = [
+                (stack.operations[entry["operation"]].bind(scope, entry.get("params", {})),
+                 stack.operations[entry["operation"]].read_only)
+                for entry in step["mix"]
+            ]
+            sequence = mix_sequence(step, calls)
+            isolation = stack.isolation or (lambda **_: nullcontext())
+
+            # writes are rolled back to a savepoint and reads followed by the stack's reset, so every call sees
+            # the same data and, for the ORM, an empty identity map; the harness counts both as isolation time
+            def operation():
+                for call, read_only in sequence:
+                    if not read_only:
+                        with timed_isolation(isolation(**scope)):
+                            call()
+                    else:
+                        call()
+                        if stack.reset:
+                            timed_reset(lambda: stack.reset(**scope))
+
+        stack.track(output_file, operation, read_only=read_only, **scope)
+
+    with operation_scope(name):
+        run()
+
+
+def run_workload(stack: Stack, workload: list[dict], record_count: int, only: list[str] = WORKLOAD_OPERATIONS):
+    """Run every step of the workload (or only the named ones) against one stack, in order."""
+    validate_workload(stack, workload)
+    steps = selected_steps(workload, only)
+    # fail before the first step rather than after an hour of them
+    for step, _, _ in steps:
+        check_isolation(step_read_only(stack, step))
+    for step, name, params in steps:
+        run_step(stack, step, name, params, record_count)
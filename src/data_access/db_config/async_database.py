@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+import logging
+from dotenv import load_dotenv
+from functools import wraps
+import asyncpg
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from src.data_access.db_config.database import ORM_DB_URL, ORM_QUERY_CACHE_SIZE
+from src.data_access.db_config.latency import operation_name, record_since
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# asyncio counterparts of database.py: asyncpg for plain SQL, SQLAlchemy AsyncSession (asyncpg dialect) for the ORM.
+# One connection per concurrent coroutine, so both pools are sized to the number of coroutines a tracker runs.
+ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", 32))
+ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", ASYNC_CONCURRENCY))
+
+# async orm config
+async_engine = create_async_engine(
+    ORM_DB_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+    echo=False,
+    query_cache_size=ORM_QUERY_CACHE_SIZE,
+    pool_size=ASYNC_POOL_SIZE,
+    max_overflow=0
+)
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine
+)
+
+_async_sql_pool = None
+_async_sql_pool_lock = asyncio.Lock()
+
+
+async def get_async_sql_pool() -> asyncpg.Pool:
+    """Return the shared asyncpg pool, creating it on first use."""
+    global _async_sql_pool
+    async with _async_sql_pool_lock:
+        if _async_sql_pool is None:
+            _async_sql_pool = await asyncpg.create_pool(
+                database=os.getenv("SQL_BENCHMARK_DB_NAME"),
+                user=os.getenv("SQL_BENCHMARK_DB_USER"),
+                password=os.getenv("SQL_BENCHMARK_DB_PASSWORD"),
+                host=os.getenv("SQL_BENCHMARK_DB_HOST"),
+                port=os.getenv("SQL_BENCHMARK_DB_PORT"),
+                min_size=1,
+                max_size=ASYNC_POOL_SIZE
+            )
+            logger.debug(f"Async SQL pool created (max={ASYNC_POOL_SIZE})")
+    return _async_sql_pool
+
+
+async def close_async_pools():
+    """Close the asyncpg pool and dispose of the async engine, call before the event loop ends."""
+    global _async_sql_pool
+    if _async_sql_pool is not None:
+        await _async_sql_pool.close()
+        _async_sql_pool = None
+    await async_engine.dispose()
+
+
+# async orm decorator with commit control, timing each phase into the latency histograms
+def async_orm_connection(commit=True):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            operation = operation_name(func)
+            phase_start = time.perf_counter_ns()
+            try:
+                async with AsyncSessionLocal() as session:
+                    logger.debug("Async ORM session started")
+                    try:
+                        await session.connection()
+                        phase_start = record_since(operation, "acquire", phase_start)
+                        result = await func(*args, **kwargs, session=session)
+                        phase_start = record_since(operation, "execute", phase_start)
+                        if commit:
+                            await session.commit()
+                            logger.debug("Async ORM changes committed")
+                            phase_start = record_since(operation, "commit", phase_start)
+                        else:
+                            await session.rollback()
+                            logger.debug("Async ORM session rolled back")
+                            phase_start = record_since(operation, "rollback", phase_start)
+                        return result
+                    except Exception as e:
+                        phase_start = record_since(operation, "error", phase_start)
+                        await session.rollback()
+                        logger.warning("Async ORM rollback due to exception")
+                        phase_start = record_since(operation, "rollback", phase_start)
+                        raise e
+                    finally:
+                        logger.debug("Async ORM session closed")
+            finally:
+                record_since(operation, "teardown", phase_start)
+        return wrapper
+    return decorator
+
+
+# async sql decorator with commit control, asyncpg has no cursors so functions get the connection
+def async_sql_connection(commit=True):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            operation = operation_name(func)
+            phase_start = time.perf_counter_ns()
+            pool = await get_async_sql_pool()
+            try:
+                async with pool.acquire() as conn:
+                    logger.debug("Async SQL connection acquired")
+                    transaction = conn.transaction()
+                    await transaction.start()
+                    phase_start = record_since(operation, "acquire", phase_start)
+                    try:
+                        result = await func(*args, **kwargs, conn=conn)
+                        phase_start = record_since(operation, "execute", phase_start)
+                        if commit:
+                            await transaction.commit()
+                            logger.debug("Async SQL changes committed")
+                            phase_start = record_since(operation, "commit", phase_start)
+                        else:
+                            await transaction.rollback()
+                            logger.debug("Async SQL transaction rolled back")
+                            phase_start = record_since(operation, "rollback", phase_start)
+                        return result
+                    except Exception as e:
+                        phase_start = record_since(operation, "error", phase_start)
+                        await transaction.rollback()
+                        logger.warning("Async SQL rollback due to exception")
+                        phase_start = record_since(operation, "rollback", phase_start)
+                        raise e
+                    finally:
+                        logger.debug("Async SQL connection released")
+            finally:
+                record_since(operation, "teardown", phase_start)
+        return wrapper
+    return decorator
@@ -1,10 +1,20 @@
 import os
+import time
+import atexit
 import logging
+from collections import Counter
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from functools import wraps
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker
 import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.pool import ThreadedConnectionPool
+from src.data_access.db_config.prepared_statements import invalidate_statements, invalidate_all_statements
+from src.data_access.db_config.latency import operation_name, record_since
+from src.data_access.models.schema import INDEX_PROFILE, applied_index_profile
+from src.data_access.db_config.query_stats import QUERY_STATS, CountingCursor, TimingCursor, instrument_engine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,13 +32,34 @@ SQL_DB_URL = f"postgresql://{os.getenv('SQL_BENCHMARK_DB_USER')}:{os.getenv('SQL
              f"{os.getenv('SQL_BENCHMARK_DB_HOST')}:{os.getenv('SQL_BENCHMARK_DB_PORT')}/" \
              f"{os.getenv('SQL_BENCHMARK_DB_NAME')}"
 
+# compiled statement cache size is a benchmark dimension: a named profile or an explicit size
+ORM_QUERY_CACHE_PROFILES = {"off": 0, "default": 500, "large": 5000}
+ORM_QUERY_CACHE = os.getenv("ORM_QUERY_CACHE", "off").lower()
+if ORM_QUERY_CACHE in ORM_QUERY_CACHE_PROFILES:
+    ORM_QUERY_CACHE_SIZE = ORM_QUERY_CACHE_PROFILES[ORM_QUERY_CACHE]
+elif ORM_QUERY_CACHE.isdigit():
+    ORM_QUERY_CACHE_SIZE = int(ORM_QUERY_CACHE)
+else:
+    raise ValueError(
+        f"Unknown ORM_QUERY_CACHE '{ORM_QUERY_CACHE}', expected one of {list(ORM_QUERY_CACHE_PROFILES)} or a size"
+    )
+
+# connection pool of the engine, SQLAlchemy's defaults unless more concurrent sessions are needed
+ORM_POOL_SIZE = int(os.getenv("ORM_POOL_SIZE", 5))
+ORM_MAX_OVERFLOW = int(os.getenv("ORM_MAX_OVERFLOW", 10))
+
 # sqlalchemy engine
 engine = create_engine(
     ORM_DB_URL,
     echo=False,
     future=True,
-    query_cache_size=0
+    query_cache_size=ORM_QUERY_CACHE_SIZE,
+    pool_size=ORM_POOL_SIZE,
+    max_overflow=ORM_MAX_OVERFLOW,
+    connect_args={"cursor_factory": CountingCursor} if QUERY_STATS else {}
 )
+if QUERY_STATS:
+    instrument_engine(engine)
 inspector = inspect(engine)
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -36,6 +67,37 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# compiled cache outcome per executed statement (cache_hit, cache_miss, caching_disabled, ...)
+_orm_cache_stats = Counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _count_compiled_cache(conn, cursor, statement, parameters, context, executemany):
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is not None:
+        _orm_cache_stats[cache_hit.name.lower()] += 1
+
+
+def orm_cache_stats() -> dict:
+    """Snapshot of the engine's compiled cache hit/miss counters."""
+    return dict(_orm_cache_stats)
+
+
+# plain SQL connection mode: "pool" reuses connections like the sqlalchemy engine does,
+# "per_call" opens a fresh psycopg2 connection for every decorated call (original behaviour)
+SQL_CONNECTION_MODE = os.getenv("SQL_CONNECTION_MODE", "pool").lower()
+SQL_POOL_MIN_SIZE = int(os.getenv("SQL_POOL_MIN_SIZE", 1))
+SQL_POOL_MAX_SIZE = int(os.getenv("SQL_POOL_MAX_SIZE", 5))
+SQL_POOL_PRE_PING = os.getenv("SQL_POOL_PRE_PING", "true").lower() == "true"
+
+if SQL_CONNECTION_MODE not in ("pool", "per_call"):
+    raise ValueError(f"Unknown SQL_CONNECTION_MODE '{SQL_CONNECTION_MODE}', expected 'pool' or 'per_call'")
+
+_sql_pool = None
+
+# every cursor of a plain SQL connection, named (server-side) ones included, is timed with QUERY_STATS
+_sql_connect_args = {"cursor_factory": TimingCursor} if QUERY_STATS else {}
+
 
 # plain SQL connection
 def get_raw_connection():
@@ -44,60 +106,201 @@ def get_raw_connection():
         user=os.getenv("SQL_BENCHMARK_DB_USER"),
         password=os.getenv("SQL_BENCHMARK_DB_PASSWORD"),
         host=os.getenv("SQL_BENCHMARK_DB_HOST"),
-        port=os.getenv("SQL_BENCHMARK_DB_PORT")
+        port=os.getenv("SQL_BENCHMARK_DB_PORT"),
+        **_sql_connect_args
     )
 
 
-# orm decorator with commit control
+def get_sql_pool() -> ThreadedConnectionPool:
+    """Return the shared plain SQL connection pool, creating it on first use."""
+    global _sql_pool
+    if _sql_pool is None:
+        _sql_pool = ThreadedConnectionPool(
+            SQL_POOL_MIN_SIZE,
+            SQL_POOL_MAX_SIZE,
+            dbname=os.getenv("SQL_BENCHMARK_DB_NAME"),
+            user=os.getenv("SQL_BENCHMARK_DB_USER"),
+            password=os.getenv("SQL_BENCHMARK_DB_PASSWORD"),
+            host=os.getenv("SQL_BENCHMARK_DB_HOST"),
+            port=os.getenv("SQL_BENCHMARK_DB_PORT"),
+            **_sql_connect_args
+        )
+        logger.debug(f"SQL pool created (min={SQL_POOL_MIN_SIZE}, max={SQL_POOL_MAX_SIZE})")
+    return _sql_pool
+
+
+def close_sql_pool():
+    """Close every pooled plain SQL connection."""
+    global _sql_pool
+    if _sql_pool is not None:
+        invalidate_all_statements()
+        _sql_pool.closeall()
+        _sql_pool = None
+        logger.debug("SQL pool closed")
+
+
+atexit.register(close_sql_pool)
+
+
+def _is_healthy(conn) -> bool:
+    """Health check on checkout, mirrors sqlalchemy's pool_pre_ping."""
+    if conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if not SQL_POOL_PRE_PING:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1;")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def acquire_raw_connection():
+    """Check out a plain SQL connection according to SQL_CONNECTION_MODE."""
+    if SQL_CONNECTION_MODE == "per_call":
+        return get_raw_connection()
+
+    pool = get_sql_pool()
+    conn = pool.getconn()
+    if not _is_healthy(conn):
+        logger.warning("Discarding broken pooled SQL connection")
+        invalidate_statements(conn)
+        pool.putconn(conn, close=True)
+        conn = pool.getconn()
+    return conn
+
+
+def release_raw_connection(conn):
+    """Return a plain SQL connection, resetting its session state before reuse."""
+    if SQL_CONNECTION_MODE == "per_call":
+        invalidate_statements(conn)
+        conn.close()
+        return
+
+    pool = get_sql_pool()
+    if conn.closed:
+        invalidate_statements(conn)
+        pool.putconn(conn, close=True)
+        return
+    try:
+        if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+        if conn.autocommit:
+            conn.autocommit = False
+        pool.putconn(conn)
+    except psycopg2.Error:
+        logger.warning("Failed to reset pooled SQL connection, closing it")
+        invalidate_statements(conn)
+        pool.putconn(conn, close=True)
+
+
+@contextmanager
+def raw_connection():
+    """Context manager around acquire/release, used by the seeding scripts."""
+    conn = acquire_raw_connection()
+    try:
+        yield conn
+    finally:
+        release_raw_connection(conn)
+
+
+def _checked_index_profile(stack: str, cursor) -> str:
+    profile = applied_index_profile(cursor)
+    if profile != INDEX_PROFILE:
+        logger.warning(f"{stack} database has index profile '{profile}', not $INDEX_PROFILE '{INDEX_PROFILE}'")
+    return profile
+
+
+def orm_index_profile() -> str:
+    """Index profile applied to the ORM database, see schema.applied_index_profile."""
+    with engine.connect() as conn:
+        cursor = conn.connection.cursor()
+        try:
+            return _checked_index_profile("ORM", cursor)
+        finally:
+            cursor.close()
+
+
+def sql_index_profile() -> str:
+    """Index profile applied to the plain SQL database, see schema.applied_index_profile."""
+    with raw_connection() as conn, conn.cursor() as cursor:
+        return _checked_index_profile("SQL", cursor)
+
+
+# orm decorator with commit control, timing each phase into the latency histograms
 def orm_connection(commit=True):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            with SessionLocal() as session:
-                logger.debug("ORM session started")
-                try:
-                    result = func(*args, **kwargs, session=session)
-                    if commit:
-                        session.commit()
-                        logger.debug("ORM changes committed")
-                    else:
+            operation = operation_name(func)
+            phase_start = time.perf_counter_ns()
+            try:
+                with SessionLocal() as session:
+                    logger.debug("ORM session started")
+                    try:
+                        # check the connection out now, so its cost is not counted as execution
+                        session.connection()
+                        phase_start = record_since(operation, "acquire", phase_start)
+                        result = func(*args, **kwargs, session=session)
+                        phase_start = record_since(operation, "execute", phase_start)
+                        if commit:
+                            session.commit()
+                            logger.debug("ORM changes committed")
+                            phase_start = record_since(operation, "commit", phase_start)
+                        else:
+                            session.rollback()
+                            logger.debug("ORM session rolled back")
+                            phase_start = record_since(operation, "rollback", phase_start)
+                        return result
+                    except Exception as e:
+                        phase_start = record_since(operation, "error", phase_start)
                         session.rollback()
-                        logger.debug("ORM session rolled back")
-                    return result
-                except Exception as e:
-                    session.rollback()
-                    logger.warning("ORM rollback due to exception")
-                    raise e
-                finally:
-                    logger.debug("ORM session closed")
+                        logger.warning("ORM rollback due to exception")
+                        phase_start = record_since(operation, "rollback", phase_start)
+                        raise e
+                    finally:
+                        logger.debug("ORM session closed")
+            finally:
+                record_since(operation, "teardown", phase_start)
         return wrapper
     return decorator
 
 
-# sql decorator with commit control
+# sql decorator with commit control, timing each phase into the latency histograms
 def sql_connection(commit=True):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            conn = get_raw_connection()
-            logger.debug("SQL connection opened")
+            operation = operation_name(func)
+            phase_start = time.perf_counter_ns()
+            conn = acquire_raw_connection()
+            logger.debug(f"SQL connection acquired ({SQL_CONNECTION_MODE})")
+            cursor = conn.cursor()
+            phase_start = record_since(operation, "acquire", phase_start)
             try:
-                cursor = conn.cursor()
                 result = func(*args, **kwargs, cursor=cursor, conn=conn)
+                phase_start = record_since(operation, "execute", phase_start)
                 if commit:
                     conn.commit()
                     logger.debug("SQL changes committed")
+                    phase_start = record_since(operation, "commit", phase_start)
                 else:
                     conn.rollback()
                     logger.debug("SQL transaction rolled back")
+                    phase_start = record_since(operation, "rollback", phase_start)
                 return result
             except Exception as e:
+                phase_start = record_since(operation, "error", phase_start)
                 conn.rollback()
                 logger.warning("SQL rollback due to exception")
+                phase_start = record_since(operation, "rollback", phase_start)
                 raise e
             finally:
                 cursor.close()
-                conn.close()
-                logger.debug("SQL connection closed")
+                release_raw_connection(conn)
+                logger.debug("SQL connection released")
+                record_since(operation, "teardown", phase_start)
         return wrapper
     return decorator
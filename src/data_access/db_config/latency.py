@@ -0,0 +1,201 @@
+import os
+import csv
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+# Latency histograms recorded by the connection decorators, one per (operation, phase):
+# acquire (connection/session checkout), execute (the decorated function), commit or rollback, and teardown
+# (cursor close and connection release). The workload engines hold one connection for a whole step, so they
+# also record every single call of the operation under the "call" phase. Buckets are HDR-style log-linear:
+# values below 2**SUB_BUCKET_BITS ns are exact, larger values keep SUB_BUCKET_BITS significant bits (< 1.6%
+# relative error). Histograms are sparse bucket counts, so they merge by adding counts, across threads,
+# repetitions and processes.
+
+LATENCY_HISTOGRAMS = os.getenv("LATENCY_HISTOGRAMS", "true").lower() == "true"
+SUB_BUCKET_BITS = 7
+SUMMARY_PERCENTILES = [50, 90, 99, 99.9]
+
+# operation name of the decorated calls in the current thread/task, set by the workload engines
+_operation = ContextVar("latency_operation", default=None)
+
+
+def bucket_index(value_ns: int) -> int:
+    value_ns = max(int(value_ns), 0)
+    exponent = max(value_ns.bit_length() - SUB_BUCKET_BITS, 0)
+    return (exponent << SUB_BUCKET_BITS) + (value_ns >> exponent)
+
+
+def bucket_value(index: int) -> int:
+    """Midpoint of the values that fall into a bucket."""
+    exponent, mantissa = divmod(index, 1 << SUB_BUCKET_BITS)
+    return (mantissa << exponent) + ((1 << exponent) >> 1)
+
+
+class LatencyHistogram:
+    def __init__(self, counts: dict[int, int] | None = None, min_ns: int | None = None, max_ns: int = 0,
+                 total_ns: int = 0):
+        self.counts = dict(counts or {})
+        self.min_ns = min_ns
+        self.max_ns = max_ns
+        self.total_ns = total_ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, value_ns: int):
+        index = bucket_index(value_ns)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.min_ns = value_ns if self.min_ns is None else min(self.min_ns, value_ns)
+        self.max_ns = max(self.max_ns, value_ns)
+        self.total_ns += value_ns
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        if other.min_ns is not None:
+            self.min_ns = other.min_ns if self.min_ns is None else min(self.min_ns, other.min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.total_ns += other.total_ns
+        return self
+
+    def percentile(self, pct: float) -> int:
+        """Nearest-rank percentile in ns, clamped to the recorded min/max."""
+        total = self.count
+        if not total:
+            return 0
+        rank = max(1, -(-total * pct // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(bucket_value(index), self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> dict:
+        return {
+            "counts": {str(index): count for index, count in sorted(self.counts.items())},
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "total_ns": self.total_ns,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        return cls(
+            counts={int(index): count for index, count in data["counts"].items()},
+            min_ns=data["min_ns"],
+            max_ns=data["max_ns"],
+            total_ns=data["total_ns"],
+        )
+
+
+_histograms: dict[tuple[str, str], LatencyHistogram] = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def operation_scope(name: str):
+    """Record the decorated calls made inside the block under `name` instead of the function name."""
+    token = _operation.set(name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+def current_operation() -> str | None:
+    return _operation.get()
+
+
+def operation_name(func) -> str:
+    return _operation.get() or func.__name__
+
+
+def record(operation: str, phase: str, value_ns: int):
+    if not LATENCY_HISTOGRAMS:
+        return
+    with _lock:
+        histogram = _histograms.get((operation, phase))
+        if histogram is None:
+            histogram = _histograms[(operation, phase)] = LatencyHistogram()
+        histogram.record(value_ns)
+
+
+def record_call(value_ns: int):
+    """Record one call of the operation of the current scope, see operation_scope."""
+    operation = _operation.get()
+    if operation is not None:
+        record(operation, "call", value_ns)
+
+
+def record_since(operation: str, phase: str, start_ns: int) -> int:
+    """Record the time since start_ns under the phase and return now, the start of the next phase."""
+    now = time.perf_counter_ns()
+    record(operation, phase, now - start_ns)
+    return now
+
+
+def snapshot() -> dict[tuple[str, str], LatencyHistogram]:
+    with _lock:
+        return {key: LatencyHistogram().merge(histogram) for key, histogram in _histograms.items()}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def export_histograms(directory: str, name: str, project_name: str = ""):
+    """Merge this process's histograms into <name>.json and append their percentiles to <name>.csv.
+
+    The JSON is keyed by (project_name, operation, phase), so runs with other settings aren't merged together.
+    """
+    histograms = snapshot()
+    if not histograms:
+        return
+    os.makedirs(directory, exist_ok=True)
+
+    json_path = os.path.join(directory, f"{name}.json")
+    merged = {}
+    if os.path.exists(json_path):
+        with open(json_path) as f:
+            merged = {
+                (entry.get("project_name", ""), entry["operation"], entry["phase"]): LatencyHistogram.from_dict(entry)
+                for entry in json.load(f)
+            }
+    for (operation, phase), histogram in histograms.items():
+        key = (project_name, operation, phase)
+        merged[key] = merged[key].merge(histogram) if key in merged else histogram
+    with open(json_path, "w") as f:
+        json.dump(
+            [{"project_name": project, "operation": operation, "phase": phase, **histogram.to_dict()}
+             for (project, operation, phase), histogram in sorted(merged.items())],
+            f,
+        )
+
+    csv_path = os.path.join(directory, f"{name}.csv")
+    fieldnames = ["timestamp", "project_name", "operation", "phase", "count", "min_ns", "mean_ns",
+                  *[f"p{pct:g}_ns" for pct in SUMMARY_PERCENTILES], "max_ns"]
+    write_header = not os.path.exists(csv_path)
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    with open(csv_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if write_header:
+            writer.writeheader()
+        for (operation, phase), histogram in sorted(histograms.items()):
+            writer.writerow({
+                "timestamp": timestamp,
+                "project_name": project_name,
+                "operation": operation,
+                "phase": phase,
+                "count": histogram.count,
+                "min_ns": histogram.min_ns,
+                "mean_ns": histogram.total_ns // histogram.count,
+                **{f"p{pct:g}_ns": histogram.percentile(pct) for pct in SUMMARY_PERCENTILES},
+                "max_ns": histogram.max_ns,
+            })
@@ -0,0 +1,72 @@
+import os
+import re
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# PREPARE each repository query once per connection and EXECUTE it afterwards
+SQL_PREPARED_STATEMENTS = os.getenv("SQL_PREPARED_STATEMENTS", "false").lower() == "true"
+
+_PLACEHOLDER = re.compile(r"%s")
+
+# connection -> (backend pid, names prepared on that backend)
+_registry = weakref.WeakKeyDictionary()
+_stats = {"prepared": 0, "executed": 0, "reused": 0, "invalidated": 0}
+
+
+def _to_positional(query: str) -> str:
+    """Rewrite psycopg2 %s placeholders into PREPARE's $1, $2, ... parameters."""
+    counter = iter(range(1, query.count("%s") + 1))
+    return _PLACEHOLDER.sub(lambda _: f"${next(counter)}", query)
+
+
+def _prepared_names(conn) -> set:
+    backend_pid = conn.info.backend_pid
+    entry = _registry.get(conn)
+    if entry is None or entry[0] != backend_pid:
+        entry = (backend_pid, set())
+        _registry[conn] = entry
+    return entry[1]
+
+
+def invalidate_statements(conn):
+    """Forget everything prepared on a connection, called when it's closed or recycled."""
+    entry = _registry.pop(conn, None)
+    if entry and entry[1]:
+        _stats["invalidated"] += len(entry[1])
+        logger.debug(f"Invalidated {len(entry[1])} prepared statements")
+
+
+def invalidate_all_statements():
+    for conn in list(_registry.keys()):
+        invalidate_statements(conn)
+
+
+def execute_statement(cursor, name: str, query: str, params: tuple = ()):
+    """Execute a repository query, through PREPARE/EXECUTE when SQL_PREPARED_STATEMENTS is on."""
+    if not SQL_PREPARED_STATEMENTS:
+        cursor.execute(query, params)
+        return
+
+    names = _prepared_names(cursor.connection)
+    if name in names:
+        _stats["reused"] += 1
+    else:
+        cursor.execute(f"PREPARE {name} AS {_to_positional(query)}")
+        names.add(name)
+        _stats["prepared"] += 1
+        logger.debug(f"Prepared statement {name}")
+
+    if params:
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cursor.execute(f"EXECUTE {name}")
+    _stats["executed"] += 1
+
+
+def statement_stats() -> dict:
+    """Counts of prepared, executed, reused and invalidated statements in this process."""
+    stats = dict(_stats)
+    stats["reuse_ratio"] = stats["reused"] / stats["executed"] if stats["executed"] else 0.0
+    return stats
@@ -0,0 +1,302 @@
+import os
+import re
+import csv
+import time
+import hashlib
+import threading
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from psycopg2.extensions import cursor as _cursor
+from sqlalchemy import event
+from src.data_access.db_config.latency import current_operation
+
+# Statement-level instrumentation of the sync stacks. Every statement is recorded under the current operation
+# (see latency.operation_scope) and its fingerprint: the statement with literals and placeholders replaced by ?,
+# so the same query with different values or batch sizes lands in one row. The ORM engine is timed with
+# SQLAlchemy's execute events, the plain SQL stack with TimingCursor; both count rows and returned bytes.
+#
+# Inside a call window (one measured call of an operation, see call_window) the time is split into
+#   compile: SQLAlchemy statement compilation and parameter processing (0 for plain SQL),
+#   execute: the driver's cursor.execute, i.e. round trip and server time,
+#   hydrate: everything else in the call, building the statement, fetching and converting rows, loading objects.
+# The time this module spends recording statements and counting returned bytes is measured too (stats_ns) and
+# left out of hydrate. Off by default: the extra Python per statement and row adds to the energy being measured.
+
+QUERY_STATS = os.getenv("QUERY_STATS", "false").lower() == "true"
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|%s|\$\d+")
+_VALUE_LIST = re.compile(r"\((?:\s*(?:\?|NULL|TRUE|FALSE)\s*,)*\s*(?:\?|NULL|TRUE|FALSE)\s*\)", re.I)
+_REPEATED_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_SAVEPOINT = re.compile(r"\bSAVEPOINT\s+\w+", re.I)
+_WHITESPACE = re.compile(r"\s+")
+
+# (operation, fingerprint) -> statement counters, operation -> call window counters
+_statements: dict[tuple[str, str], dict] = {}
+_breakdown: dict[str, dict] = {}
+_lock = threading.Lock()
+
+_in_call = ContextVar("query_stats_in_call", default=False)
+
+
+@lru_cache(maxsize=1024)
+def _normalize(statement: str) -> str:
+    normalized = _SAVEPOINT.sub("SAVEPOINT ?", _LITERAL.sub("?", statement))
+    normalized = _REPEATED_LIST.sub("(?)", _VALUE_LIST.sub("(?)", normalized))
+    return _WHITESPACE.sub(" ", normalized).strip().rstrip(";")
+
+
+def fingerprint(statement) -> tuple[str, str]:
+    """Normalized statement text and its short hash."""
+    if isinstance(statement, bytes):
+        statement = statement.decode(errors="replace")
+    normalized = _normalize(statement)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def _row_bytes(row) -> int:
+    """Approximate size of a returned row: the text-format length of its values."""
+    return sum(
+        len(value) if isinstance(value, (str, bytes)) else len(str(value)) for value in row if value is not None
+    )
+
+
+def record_statement(statement, execute_ns: int, rowcount: int, compile_ns: int = 0,
+                     overhead_start: int | None = None) -> dict:
+    """Record one executed statement and return its counters, for adding the bytes fetched later.
+
+    `overhead_start` is when the caller's own bookkeeping started, counted with this function's time as stats_ns.
+    """
+    overhead_start = overhead_start or time.perf_counter_ns()
+    operation = current_operation() or "-"
+    key, normalized = fingerprint(statement)
+    in_call = _in_call.get()
+    with _lock:
+        entry = _statements.get((operation, key))
+        if entry is None:
+            entry = _statements[(operation, key)] = {
+                "statement": normalized, "executions": 0, "compile_ns": 0, "execute_ns": 0, "rows": 0, "bytes": 0,
+            }
+        entry["executions"] += 1
+        entry["compile_ns"] += compile_ns
+        entry["execute_ns"] += execute_ns
+        entry["rows"] += max(rowcount, 0)
+        if in_call:
+            window = _window(operation)
+            window["statements"] += 1
+            window["compile_ns"] += compile_ns
+            window["execute_ns"] += execute_ns
+            window["stats_ns"] += time.perf_counter_ns() - overhead_start
+    return entry
+
+
+def _record_bytes(entry: dict | None, rows, count_rows: bool = False):
+    """Add the size of fetched rows to a statement, and their number when its rowcount wasn't known."""
+    if entry is None or not rows:
+        return
+    start = time.perf_counter_ns()
+    size = sum(_row_bytes(row) for row in rows)
+    in_call = _in_call.get()
+    operation = current_operation() or "-"
+    with _lock:
+        entry["bytes"] += size
+        if count_rows:
+            entry["rows"] += len(rows)
+        if in_call:
+            _window(operation)["stats_ns"] += time.perf_counter_ns() - start
+
+
+def _window(operation: str) -> dict:
+    window = _breakdown.get(operation)
+    if window is None:
+        window = _breakdown[operation] = {
+            "calls": 0, "statements": 0, "call_ns": 0, "compile_ns": 0, "execute_ns": 0, "stats_ns": 0,
+        }
+    return window
+
+
+@contextmanager
+def _call_window():
+    token = _in_call.set(True)
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter_ns() - start
+        _in_call.reset(token)
+        operation = current_operation()
+        if operation is not None:
+            with _lock:
+                window = _window(operation)
+                window["calls"] += 1
+                window["call_ns"] += elapsed
+
+
+def call_window():
+    """Mark one measured call of the current operation, its statements make up the compile/execute/hydrate split."""
+    return _call_window() if QUERY_STATS else nullcontext()
+
+
+class CountingCursor(_cursor):
+    """psycopg2 cursor that adds the size of fetched rows to the statement that produced them. Rows of a named
+    (server-side) cursor are counted while it is iterated, its rowcount isn't known at execute."""
+
+    _query_stats_entry = None
+
+    def __next__(self):
+        row = super().__next__()
+        _record_bytes(self._query_stats_entry, [row], count_rows=self.name is not None)
+        return row
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            _record_bytes(self._query_stats_entry, [row], count_rows=self.name is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        _record_bytes(self._query_stats_entry, rows, count_rows=self.name is not None)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        _record_bytes(self._query_stats_entry, rows, count_rows=self.name is not None)
+        return rows
+
+
+class TimingCursor(CountingCursor):
+    """CountingCursor that also times every execute, used by the plain SQL stack."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter_ns()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._record(query, start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter_ns()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._record(query, start)
+
+    def _record(self, query, start: int):
+        executed = time.perf_counter_ns()
+        if not isinstance(query, (str, bytes)):
+            query = query.as_string(self)
+        self._query_stats_entry = record_statement(query, executed - start, self.rowcount, overhead_start=executed)
+
+
+def instrument_engine(engine):
+    """Time compilation and execution of every statement of a SQLAlchemy engine through its events.
+
+    The engine's connections should use CountingCursor (connect_args cursor_factory) for the returned bytes.
+    """
+    @event.listens_for(engine, "before_execute")
+    def _before_execute(conn, clauseelement, multiparams, params, execution_options):
+        conn.info["query_stats_compile_start"] = time.perf_counter_ns()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        now = time.perf_counter_ns()
+        # insertmanyvalues runs several batches per compiled statement, only the first one carries the compile time
+        compile_start = conn.info.pop("query_stats_compile_start", None)
+        conn.info["query_stats_compile_ns"] = now - compile_start if compile_start is not None else 0
+        conn.info["query_stats_execute_start"] = now
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed = time.perf_counter_ns()
+        entry = record_statement(
+            statement,
+            executed - conn.info.pop("query_stats_execute_start"),
+            cursor.rowcount,
+            conn.info.pop("query_stats_compile_ns", 0),
+            overhead_start=executed,
+        )
+        if isinstance(cursor, CountingCursor):
+            cursor._query_stats_entry = entry
+
+
+def reset():
+    with _lock:
+        _statements.clear()
+        _breakdown.clear()
+
+
+def export_query_stats(directory: str, stack_name: str, record_count: int, project_name: str = ""):
+    """Append per-statement rows to <stack>_statements_<size>.csv and the call split to <stack>_breakdown_<size>.csv."""
+    with _lock:
+        statements = {key: dict(entry) for key, entry in _statements.items()}
+        breakdown = {operation: dict(window) for operation, window in _breakdown.items()}
+    if not statements:
+        return
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.now().isoformat(timespec="seconds")
+
+    _append_csv(
+        os.path.join(directory, f"{stack_name}_statements_{record_count}.csv"),
+        ["timestamp", "project_name", "operation", "fingerprint", "executions", "compile_ns", "execute_ns",
+         "mean_execute_ns", "rows", "bytes", "statement"],
+        [
+            {
+                "timestamp": timestamp,
+                "project_name": project_name,
+                "operation": operation,
+                "fingerprint": key,
+                **{field: entry[field] for field in ("executions", "compile_ns", "execute_ns", "rows", "bytes")},
+                "mean_execute_ns": entry["execute_ns"] // entry["executions"],
+                "statement": entry["statement"],
+            }
+            for (operation, key), entry in sorted(statements.items())
+        ],
+    )
+
+    rows = []
+    for operation, window in sorted(breakdown.items()):
+        if not window["calls"]:
+            continue
+        hydrate_ns = max(window["call_ns"] - window["compile_ns"] - window["execute_ns"] - window["stats_ns"], 0)
+        total_ns = window["call_ns"] or 1
+        rows.append({
+            "timestamp": timestamp,
+            "project_name": project_name,
+            "operation": operation,
+            "calls": window["calls"],
+            "statements": window["statements"],
+            "call_ns": window["call_ns"],
+            "compile_ns": window["compile_ns"],
+            "execute_ns": window["execute_ns"],
+            "hydrate_ns": hydrate_ns,
+            "stats_ns": window["stats_ns"],
+            "compile_share": window["compile_ns"] / total_ns,
+            "execute_share": window["execute_ns"] / total_ns,
+            "hydrate_share": hydrate_ns / total_ns,
+        })
+    _append_csv(
+        os.path.join(directory, f"{stack_name}_breakdown_{record_count}.csv"),
+        ["timestamp", "project_name", "operation", "calls", "statements", "call_ns", "compile_ns", "execute_ns",
+         "hydrate_ns", "stats_ns", "compile_share", "execute_share", "hydrate_share"],
+        rows,
+    )
+
+
+def _append_csv(path: str, fieldnames: list[str], rows: list[dict]):
+    if not rows:
+        return
+    write_header = not os.path.exists(path)
+    if not write_header:
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames != fieldnames:
+                # written before columns were added: rewrite it with the current header
+                rows = [*reader, *rows]
+                write_header = True
+    with open(path, "w" if write_header else "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore", restval="")
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
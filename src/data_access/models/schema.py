@@ -0,0 +1,72 @@
+import os
+
+# Single physical layout for the customer table, applied to both the ORM and the SQL database.
+# Mirrors src/data_access/models/customer.py so both stacks are measured against the same table.
+
+CUSTOMER_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS customer (
+        customer_id UUID PRIMARY KEY,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL,
+        email TEXT NOT NULL UNIQUE,
+        signup_date DATE NOT NULL,
+        monthly_spend DECIMAL(10, 2) NOT NULL,
+        contract_type TEXT NOT NULL,
+        is_active BOOLEAN NOT NULL
+    );
+"""
+
+# secondary indexes for the filtered operations, keyed by index name
+INDEXES = {
+    "ix_customer_active_monthly_spend":
+        "CREATE INDEX ix_customer_active_monthly_spend ON customer (monthly_spend DESC) WHERE is_active;",
+    "ix_customer_contract_type":
+        "CREATE INDEX ix_customer_contract_type ON customer (contract_type);",
+    "ix_customer_is_active":
+        "CREATE INDEX ix_customer_is_active ON customer (is_active);",
+}
+
+# named index profiles, the profile is a result dimension for both stacks
+INDEX_PROFILES = {
+    "none": [],
+    "top_spending": ["ix_customer_active_monthly_spend"],
+    "contract_type": ["ix_customer_contract_type"],
+    "is_active": ["ix_customer_is_active"],
+    "all": list(INDEXES),
+}
+
+INDEX_PROFILE = os.getenv("INDEX_PROFILE", "none").lower()
+
+
+def drop_customer_table(cursor):
+    cursor.execute("DROP TABLE IF EXISTS customer;")
+
+
+def create_customer_table(cursor):
+    cursor.execute(CUSTOMER_TABLE_DDL)
+
+
+def apply_index_profile(cursor, profile: str = INDEX_PROFILE):
+    """Drop every known secondary index, then create the ones in the named profile."""
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"Unknown index profile '{profile}', expected one of {list(INDEX_PROFILES)}")
+
+    for name in INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name};")
+    for name in INDEX_PROFILES[profile]:
+        cursor.execute(INDEXES[name])
+    cursor.execute("ANALYZE customer;")
+
+
+def applied_index_profile(cursor) -> str:
+    """Profile whose secondary indexes exist on the customer table, read back from pg_indexes.
+
+    Results are labelled with this rather than $INDEX_PROFILE, which may differ from what the database was
+    seeded with (seed_database.py --index-profile). "custom" when the indexes match no profile.
+    """
+    cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'customer';")
+    names = {row[0] for row in cursor.fetchall()} & set(INDEXES)
+    for profile, indexes in INDEX_PROFILES.items():
+        if names == set(indexes):
+            return profile
+    return "custom"
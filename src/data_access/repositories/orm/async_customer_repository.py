@@ -0,0 +1,199 @@
+from datetime import date
+from typing import AsyncIterator
+from sqlalchemy import select, insert, update, delete, func, lambda_stmt, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.data_access.models.customer import Customer
+from src.data_access.repositories.orm.customer_repository import (
+    _GET_MANY_CUSTOMERS_STMT,
+    _TOP_SPENDING_CUSTOMERS_STMT,
+    _GET_CUSTOMER_BY_ID_STMT,
+)
+
+# --------------------
+# SETUP /
+# --------------------
+
+
+async def insert_known_benchmark_customer(session: AsyncSession) -> Customer:
+    """Insert a known customer record to support repeatable queries (async ORM)"""
+    stmt = select(Customer).where(
+        Customer.customer_id == "c57b2b8e-2d0c-40b2-9b46-6d0f753c1494"
+    )
+    existing = (await session.scalars(stmt)).first()
+    if existing:
+        return existing
+
+    customer = Customer(
+        customer_id="c57b2b8e-2d0c-40b2-9b46-6d0f753c1494",
+        name="Benchmark User",
+        age=35,
+        email="benchmark_user@example.com",
+        signup_date=date(2022, 1, 1),
+        monthly_spend=42.50,
+        contract_type="Prepaid",
+        is_active=True
+    )
+    session.add(customer)
+    return customer
+
+
+async def sample_customer_ids(session: AsyncSession, n: int, seed: float = 0.42) -> list[UUID]:
+    """Sample n existing customer IDs with a fixed random seed for repeatable lookups (async ORM)"""
+    await session.execute(select(func.setseed(seed)))
+    stmt = select(Customer.customer_id).order_by(func.random()).limit(n)
+    return list((await session.scalars(stmt)).all())
+
+# --------------------
+# CREATE
+# --------------------
+
+
+async def create_customer(session: AsyncSession, customer: Customer) -> Customer:
+    """Insert a new customer (async ORM)"""
+    session.add(customer)
+    return customer
+
+
+async def create_customers_bulk(session: AsyncSession, records: list[dict]) -> None:
+    """Insert many customers from a list of dicts with one executemany/insertmanyvalues call (async ORM)"""
+    await session.execute(insert(Customer), records)
+
+# --------------------
+# READ
+# --------------------
+
+
+async def get_many_customers(session: AsyncSession) -> list[Customer]:
+    """Fetch all customers (async ORM)"""
+    stmt = select(Customer)
+    return (await session.scalars(stmt)).all()
+
+
+async def stream_many_customers(session: AsyncSession, fetch_size: int = 2000) -> AsyncIterator[Customer]:
+    """Stream all customers with a server-side cursor, fetch_size rows per batch (async ORM).
+
+    Must be consumed while the session is still open.
+    """
+    stmt = select(Customer).execution_options(yield_per=fetch_size)
+    async for customer in await session.stream_scalars(stmt):
+        yield customer
+
+
+async def get_many_customers_cached(session: AsyncSession) -> list[Customer]:
+    """Fetch all customers with a pre-built select (async ORM)"""
+    return (await session.scalars(_GET_MANY_CUSTOMERS_STMT)).all()
+
+
+async def get_many_customers_lambda(session: AsyncSession) -> list[Customer]:
+    """Fetch all customers with a lambda_stmt (async ORM)"""
+    stmt = lambda_stmt(lambda: select(Customer))
+    return (await session.scalars(stmt)).all()
+
+
+async def fetch_top_spending_customers(session: AsyncSession, limit: int = 10) -> list[Customer]:
+    """Fetch top N customers with the highest monthly spend (async ORM)"""
+    stmt = (
+        select(Customer)
+        .where(Customer.is_active == True)
+        .order_by(Customer.monthly_spend.desc())
+        .limit(limit)
+    )
+    return (await session.scalars(stmt)).all()
+
+
+async def fetch_top_spending_customers_cached(session: AsyncSession, limit: int = 10) -> list[Customer]:
+    """Fetch top N customers with the highest monthly spend with a pre-built select (async ORM)"""
+    return (await session.scalars(_TOP_SPENDING_CUSTOMERS_STMT, {"limit": limit})).all()
+
+
+async def fetch_top_spending_customers_lambda(session: AsyncSession, limit: int = 10) -> list[Customer]:
+    """Fetch top N customers with the highest monthly spend with a lambda_stmt (async ORM)"""
+    stmt = lambda_stmt(
+        lambda: select(Customer)
+        .where(Customer.is_active == True)
+        .order_by(Customer.monthly_spend.desc())
+        .limit(limit)
+    )
+    return (await session.scalars(stmt)).all()
+
+
+async def get_one_customer_by_id(session: AsyncSession, customer_id: UUID) -> Customer | None:
+    """Fetch one customer by ID (async ORM)"""
+    return await session.get(Customer, customer_id)
+
+
+async def get_one_customer_by_id_cached(session: AsyncSession, customer_id: UUID) -> Customer | None:
+    """Fetch one customer by ID with a pre-built select (async ORM)"""
+    return (await session.scalars(_GET_CUSTOMER_BY_ID_STMT, {"customer_id": customer_id})).first()
+
+
+async def get_one_customer_by_id_lambda(session: AsyncSession, customer_id: UUID) -> Customer | None:
+    """Fetch one customer by ID with a lambda_stmt (async ORM)"""
+    stmt = lambda_stmt(lambda: select(Customer).where(Customer.customer_id == customer_id))
+    return (await session.scalars(stmt)).first()
+
+
+async def get_customers_by_ids(session: AsyncSession, customer_ids: list[UUID]) -> dict[UUID, Customer]:
+    """Fetch many customers by ID, keyed by ID (async ORM)
+
+    Like session.get, customers already in the identity map are returned without a query;
+    the rest are loaded with a single IN query.
+    """
+    found = {}
+    missing = []
+    for customer_id in customer_ids:
+        customer = session.identity_map.get(session.identity_key(Customer, customer_id))
+        if customer is not None:
+            found[customer_id] = customer
+        else:
+            missing.append(customer_id)
+
+    if missing:
+        stmt = select(Customer).where(Customer.customer_id.in_(missing))
+        for customer in await session.scalars(stmt):
+            found[customer.customer_id] = customer
+    return found
+
+# --------------------
+# UPDATE
+# --------------------
+
+
+async def update_one_customer_email(session: AsyncSession, customer_id: UUID, new_email: str) -> None:
+    """Update a customer's email by ID (async ORM)"""
+    customer = await session.get(Customer, customer_id)
+    if customer:
+        customer.email = new_email
+
+
+async def update_many_prepaid_to_monthly(session: AsyncSession) -> None:
+    """Bulk‐update all customers with a 'Prepaid' contract to 'Monthly' (async ORM)."""
+    stmt = (
+        update(Customer)
+        .where(Customer.contract_type == "Prepaid")
+        .values(contract_type="Monthly")
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+
+# --------------------
+# DELETE
+# --------------------
+
+
+async def delete_one_customer_by_id(session: AsyncSession, customer_id: UUID) -> None:
+    """Delete a customer by ID (async ORM)"""
+    customer = await session.get(Customer, customer_id)
+    if customer:
+        await session.delete(customer)
+
+
+async def delete_many_inactive_customers(session: AsyncSession) -> None:
+    """Bulk‐delete all inactive customers (async ORM)."""
+    stmt = (
+        delete(Customer)
+        .where(Customer.is_active == False)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
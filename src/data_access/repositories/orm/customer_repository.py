@@ -1,8 +1,19 @@
 from datetime import date
-from sqlalchemy import select, update, delete, UUID
+from typing import Iterator
+from sqlalchemy import select, insert, update, delete, func, bindparam, lambda_stmt, UUID
 from sqlalchemy.orm import Session
 from src.data_access.models.customer import Customer
 
+# pre-built statements, constructed once at import for the *_cached variants
+_GET_MANY_CUSTOMERS_STMT = select(Customer)
+_TOP_SPENDING_CUSTOMERS_STMT = (
+    select(Customer)
+    .where(Customer.is_active == True)
+    .order_by(Customer.monthly_spend.desc())
+    .limit(bindparam("limit"))
+)
+_GET_CUSTOMER_BY_ID_STMT = select(Customer).where(Customer.customer_id == bindparam("customer_id"))
+
 # --------------------
 # SETUP /
 # --------------------
@@ -30,6 +41,13 @@ def insert_known_benchmark_customer(session: Session) -> Customer:
     session.add(customer)
     return customer
 
+
+def sample_customer_ids(session: Session, n: int, seed: float = 0.42) -> list[UUID]:
+    """Sample n existing customer IDs with a fixed random seed for repeatable lookups (ORM)"""
+    session.execute(select(func.setseed(seed)))
+    stmt = select(Customer.customer_id).order_by(func.random()).limit(n)
+    return list(session.scalars(stmt).all())
+
 # --------------------
 # CREATE
 # --------------------
@@ -40,6 +58,11 @@ def create_customer(session: Session, customer: Customer) -> Customer:
     session.add(customer)
     return customer
 
+
+def create_customers_bulk(session: Session, records: list[dict]) -> None:
+    """Insert many customers from a list of dicts with one executemany/insertmanyvalues call (ORM)"""
+    session.execute(insert(Customer), records)
+
 # --------------------
 # READ
 # --------------------
@@ -51,6 +74,26 @@ def get_many_customers(session: Session) -> list[Customer]:
     return session.scalars(stmt).all()
 
 
+def stream_many_customers(session: Session, fetch_size: int = 2000) -> Iterator[Customer]:
+    """Stream all customers with yield_per/stream_results, fetch_size rows per batch (ORM).
+
+    Must be consumed while the session is still open.
+    """
+    stmt = select(Customer).execution_options(yield_per=fetch_size)
+    yield from session.scalars(stmt)
+
+
+def get_many_customers_cached(session: Session) -> list[Customer]:
+    """Fetch all customers with a pre-built select (ORM)"""
+    return session.scalars(_GET_MANY_CUSTOMERS_STMT).all()
+
+
+def get_many_customers_lambda(session: Session) -> list[Customer]:
+    """Fetch all customers with a lambda_stmt (ORM)"""
+    stmt = lambda_stmt(lambda: select(Customer))
+    return session.scalars(stmt).all()
+
+
 def fetch_top_spending_customers(session: Session, limit: int = 10) -> list[Customer]:
     """Fetch top N customers with the highest monthly spend (ORM)"""
     stmt = (
@@ -62,10 +105,58 @@ def fetch_top_spending_customers(session: Session, limit: int = 10) -> list[Cust
     return session.scalars(stmt).all()
 
 
+def fetch_top_spending_customers_cached(session: Session, limit: int = 10) -> list[Customer]:
+    """Fetch top N customers with the highest monthly spend with a pre-built select (ORM)"""
+    return session.scalars(_TOP_SPENDING_CUSTOMERS_STMT, {"limit": limit}).all()
+
+
+def fetch_top_spending_customers_lambda(session: Session, limit: int = 10) -> list[Customer]:
+    """Fetch top N customers with the highest monthly spend with a lambda_stmt (ORM)"""
+    stmt = lambda_stmt(
+        lambda: select(Customer)
+        .where(Customer.is_active == True)
+        .order_by(Customer.monthly_spend.desc())
+        .limit(limit)
+    )
+    return session.scalars(stmt).all()
+
+
 def get_one_customer_by_id(session: Session, customer_id: UUID) -> Customer | None:
     """Fetch one customer by ID (ORM)"""
     return session.get(Customer, customer_id)
 
+
+def get_one_customer_by_id_cached(session: Session, customer_id: UUID) -> Customer | None:
+    """Fetch one customer by ID with a pre-built select (ORM)"""
+    return session.scalars(_GET_CUSTOMER_BY_ID_STMT, {"customer_id": customer_id}).first()
+
+
+def get_one_customer_by_id_lambda(session: Session, customer_id: UUID) -> Customer | None:
+    """Fetch one customer by ID with a lambda_stmt (ORM)"""
+    stmt = lambda_stmt(lambda: select(Customer).where(Customer.customer_id == customer_id))
+    return session.scalars(stmt).first()
+
+def get_customers_by_ids(session: Session, customer_ids: list[UUID]) -> dict[UUID, Customer]:
+    """Fetch many customers by ID, keyed by ID (ORM)
+
+    Like session.get, customers already in the identity map are returned without a query;
+    the rest are loaded with a single IN query.
+    """
+    found = {}
+    missing = []
+    for customer_id in customer_ids:
+        customer = session.identity_map.get(session.identity_key(Customer, customer_id))
+        if customer is not None:
+            found[customer_id] = customer
+        else:
+            missing.append(customer_id)
+
+    if missing:
+        stmt = select(Customer).where(Customer.customer_id.in_(missing))
+        for customer in session.scalars(stmt):
+            found[customer.customer_id] = customer
+    return found
+
 # --------------------
 # UPDATE
 # --------------------
@@ -0,0 +1,163 @@
+# Plain SQL asyncio Implementation of Customer Repository (asyncpg)
+# asyncpg prepares and caches every statement per connection, so there is no separate prepared statement mode.
+from datetime import date
+from typing import AsyncIterator
+
+# --------------------
+# SETUP / TESTING HELPERS
+# --------------------
+
+async def insert_known_benchmark_customer(conn):
+    """Insert a known customer with a fixed ID for repeatable queries (async SQL)."""
+    query = """
+        INSERT INTO customer (customer_id, name, age, email, signup_date, monthly_spend, contract_type, is_active)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (customer_id) DO NOTHING;
+    """
+    await conn.execute(
+        query,
+        "c57b2b8e-2d0c-40b2-9b46-6d0f753c1494",
+        "Benchmark User",
+        30,
+        "benchmark_user@example.com",
+        date(2022, 1, 1),
+        99.99,
+        "Monthly",
+        True
+    )
+
+
+async def sample_customer_ids(conn, n: int, seed: float = 0.42) -> list[str]:
+    """Sample n existing customer IDs with a fixed random seed for repeatable lookups (async SQL)."""
+    await conn.execute("SELECT setseed($1);", seed)
+    rows = await conn.fetch("SELECT customer_id FROM customer ORDER BY random() LIMIT $1;", n)
+    return [str(row[0]) for row in rows]
+
+
+# --------------------
+# CREATE
+# --------------------
+
+def _customer_values(customer_data: dict) -> tuple:
+    return (
+        customer_data["customer_id"],
+        customer_data["name"],
+        customer_data["age"],
+        customer_data["email"],
+        customer_data["signup_date"],
+        customer_data["monthly_spend"],
+        customer_data["contract_type"],
+        customer_data["is_active"]
+    )
+
+
+async def create_customer(conn, customer_data: dict):
+    """Create a new customer (async SQL)"""
+    query = """
+        INSERT INTO customer (
+            customer_id, name, age, email, signup_date,
+            monthly_spend, contract_type, is_active
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (customer_id) DO NOTHING;
+    """
+    await conn.execute(query, *_customer_values(customer_data))
+
+
+async def create_customers_bulk(conn, records: list[dict]):
+    """Create many customers with one pipelined executemany (async SQL)"""
+    query = """
+        INSERT INTO customer (
+            customer_id, name, age, email, signup_date,
+            monthly_spend, contract_type, is_active
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (customer_id) DO NOTHING;
+    """
+    await conn.executemany(query, [_customer_values(r) for r in records])
+
+
+# --------------------
+# READ
+# --------------------
+
+async def get_many_customers(conn):
+    """Fetch all customers (async SQL)"""
+    return await conn.fetch("SELECT * FROM customer")
+
+
+async def stream_many_customers(conn, fetch_size: int = 2000) -> AsyncIterator:
+    """Stream all customers through a server-side cursor, fetch_size rows per round trip (async SQL).
+
+    Must be consumed inside the connection's transaction.
+    """
+    async for row in conn.cursor("SELECT * FROM customer", prefetch=fetch_size):
+        yield row
+
+
+async def fetch_top_spending_customers(conn, limit: int = 10):
+    """Fetch top N highest spending active customers (async SQL)"""
+    query = """
+        SELECT *
+        FROM customer
+        WHERE is_active = true
+        ORDER BY monthly_spend DESC
+        LIMIT $1;
+    """
+    return await conn.fetch(query, limit)
+
+
+async def get_one_customer_by_id(conn, customer_id: str):
+    """Fetch one customer by ID (async SQL)"""
+    query = """
+        SELECT *
+        FROM customer
+        WHERE customer_id = $1
+    """
+    return await conn.fetchrow(query, customer_id)
+
+
+async def get_customers_by_ids(conn, customer_ids: list[str]) -> dict:
+    """Fetch many customers by ID in one round trip, keyed by ID (async SQL)"""
+    query = """
+        SELECT *
+        FROM customer
+        WHERE customer_id = ANY($1::uuid[])
+    """
+    rows = await conn.fetch(query, [str(customer_id) for customer_id in customer_ids])
+    return {str(row[0]): row for row in rows}
+
+
+# --------------------
+# UPDATE
+# --------------------
+
+async def update_one_customer_email(conn, customer_id: str, new_email: str):
+    """Update a customer's email address by ID (async SQL)"""
+    query = """
+        UPDATE customer
+        SET email = $1
+        WHERE customer_id = $2;
+    """
+    await conn.execute(query, new_email, customer_id)
+
+
+async def update_many_prepaid_to_monthly(conn):
+    """Update all customers with a 'Prepaid' contract to 'Monthly' (async SQL)"""
+    query = """
+        UPDATE customer
+        SET contract_type = 'Monthly'
+        WHERE contract_type = 'Prepaid';
+    """
+    await conn.execute(query)
+
+# --------------------
+# DELETE
+# --------------------
+
+async def delete_one_customer_by_id(conn, customer_id: str):
+    """Delete a customer by ID (async SQL)"""
+    await conn.execute("DELETE FROM customer WHERE customer_id = $1;", customer_id)
+
+
+async def delete_many_inactive_customers(conn):
+    """Delete all inactive customers (async SQL)"""
+    await conn.execute("DELETE FROM customer WHERE is_active = false;")
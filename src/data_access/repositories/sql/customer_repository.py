@@ -1,4 +1,6 @@
 # Plain SQL Implementation of Customer Repository
+from psycopg2.extras import execute_values
+from src.data_access.db_config.prepared_statements import execute_statement
 
 # --------------------
 # SETUP / TESTING HELPERS
@@ -25,6 +27,13 @@ def insert_known_benchmark_customer(cursor):
     cursor.execute(query, values)
 
 
+def sample_customer_ids(cursor, n: int, seed: float = 0.42) -> list[str]:
+    """Sample n existing customer IDs with a fixed random seed for repeatable lookups (SQL)."""
+    cursor.execute("SELECT setseed(%s);", (seed,))
+    cursor.execute("SELECT customer_id FROM customer ORDER BY random() LIMIT %s;", (n,))
+    return [row[0] for row in cursor.fetchall()]
+
+
 # --------------------
 # CREATE
 # --------------------
@@ -48,7 +57,32 @@ def create_customer(cursor, customer_data: dict):
         customer_data["contract_type"],
         customer_data["is_active"]
     )
-    cursor.execute(query, values)
+    execute_statement(cursor, "create_customer", query, values)
+
+
+def create_customers_bulk(cursor, records: list[dict], page_size: int = 1000):
+    """Create many customers with multi-row VALUES statements (SQL)"""
+    query = """
+        INSERT INTO customer (
+            customer_id, name, age, email, signup_date,
+            monthly_spend, contract_type, is_active
+        ) VALUES %s
+        ON CONFLICT (customer_id) DO NOTHING;
+    """
+    values = [
+        (
+            r["customer_id"],
+            r["name"],
+            r["age"],
+            r["email"],
+            r["signup_date"],
+            r["monthly_spend"],
+            r["contract_type"],
+            r["is_active"]
+        )
+        for r in records
+    ]
+    execute_values(cursor, query, values, page_size=page_size)
 
 
 # --------------------
@@ -57,19 +91,31 @@ def create_customer(cursor, customer_data: dict):
 
 def get_many_customers(cursor):
     """Fetch all customers (SQL)"""
-    cursor.execute("SELECT * FROM customer")
+    execute_statement(cursor, "get_many_customers", "SELECT * FROM customer")
     return cursor.fetchall()
 
 
+def stream_many_customers(conn, fetch_size: int = 2000):
+    """Stream all customers through a server-side (named) cursor, fetch_size rows per round trip (SQL).
+
+    Must be consumed while the connection's transaction is still open.
+    """
+    with conn.cursor(name="stream_many_customers") as cursor:
+        cursor.itersize = fetch_size
+        cursor.execute("SELECT * FROM customer")
+        yield from cursor
+
+
 def fetch_top_spending_customers(cursor, limit: int = 10):
     """Fetch top N highest spending active customers (SQL)"""
-    cursor.execute("""
+    query = """
         SELECT * 
         FROM customer
         WHERE is_active = true 
         ORDER BY monthly_spend DESC 
         LIMIT %s;
-    """, (limit,))
+    """
+    execute_statement(cursor, "fetch_top_spending_customers", query, (limit,))
     return cursor.fetchall()
 
 
@@ -80,10 +126,23 @@ def get_one_customer_by_id(cursor, customer_id: str):
         FROM customer
         WHERE customer_id = %s
     """
-    cursor.execute(query, (customer_id,))
+    execute_statement(cursor, "get_one_customer_by_id", query, (customer_id,))
     return cursor.fetchone()
 
 
+def get_customers_by_ids(cursor, customer_ids: list[str]) -> dict:
+    """Fetch many customers by ID in one round trip, keyed by ID (SQL)"""
+    query = """
+        SELECT *
+        FROM customer
+        WHERE customer_id = ANY(%s::uuid[])
+    """
+    # passed as an array literal so it also coerces to uuid[] as an EXECUTE parameter
+    id_array = "{" + ",".join(str(customer_id) for customer_id in customer_ids) + "}"
+    execute_statement(cursor, "get_customers_by_ids", query, (id_array,))
+    return {str(row[0]): row for row in cursor.fetchall()}
+
+
 # --------------------
 # UPDATE
 # --------------------
@@ -95,7 +154,7 @@ def update_one_customer_email(cursor, customer_id: str, new_email: str):
         SET email = %s
         WHERE customer_id = %s;
     """
-    cursor.execute(query, (new_email, customer_id))
+    execute_statement(cursor, "update_one_customer_email", query, (new_email, customer_id))
 
 
 def update_many_prepaid_to_monthly(cursor):
@@ -105,7 +164,7 @@ def update_many_prepaid_to_monthly(cursor):
         SET contract_type = 'Monthly'
         WHERE contract_type = 'Prepaid';
     """
-    cursor.execute(query)
+    execute_statement(cursor, "update_many_prepaid_to_monthly", query)
 
 # --------------------
 # DELETE
@@ -114,10 +173,10 @@ def update_many_prepaid_to_monthly(cursor):
 def delete_one_customer_by_id(cursor, customer_id: str):
     """Delete a customer by ID (SQL)"""
     query = "DELETE FROM customer WHERE customer_id = %s;"
-    cursor.execute(query, (customer_id,))
+    execute_statement(cursor, "delete_one_customer_by_id", query, (customer_id,))
 
 
 def delete_many_inactive_customers(cursor):
     """Delete all inactive customers (SQL)"""
     query = "DELETE FROM customer WHERE is_active = false;"
-    cursor.execute(query)
\ No newline at end of file
+    execute_statement(cursor, "delete_many_inactive_customers", query)
\ No newline at end of file
@@ -1,15 +1,39 @@
 import os
+import csv
 import uuid
 import logging
-from codecarbon import EmissionsTracker
-from src.data_access.db_config.database import orm_connection
+from datetime import date, datetime
+from src.data_access.db_config.database import (
+    orm_index_profile,
+    orm_connection,
+    orm_cache_stats,
+    ORM_QUERY_CACHE,
+    ORM_QUERY_CACHE_SIZE,
+)
 from src.data_access.models.customer import Customer
+from src.benchmark.energy import TrackerSession
+from src.benchmark.profiler import PROFILE
+from src.benchmark.postgres_stats import orm_backend_pid
+from src.data_access.db_config.latency import export_histograms
+from src.data_access.db_config.query_stats import export_query_stats
+from src.benchmark.harness import measure_operation, orm_savepoint
+from src.benchmark.workload import Operation, Stack, load_workload, require_count, run_workload
 from src.data_access.repositories.orm.customer_repository import (
     insert_known_benchmark_customer,
+    sample_customer_ids,
     create_customer,
+    create_customers_bulk,
     get_many_customers,
+    get_many_customers_cached,
+    get_many_customers_lambda,
+    stream_many_customers,
     fetch_top_spending_customers,
+    fetch_top_spending_customers_cached,
+    fetch_top_spending_customers_lambda,
     get_one_customer_by_id,
+    get_one_customer_by_id_cached,
+    get_one_customer_by_id_lambda,
+    get_customers_by_ids,
     update_one_customer_email,
     update_many_prepaid_to_monthly,
     delete_many_inactive_customers,
@@ -27,171 +51,188 @@ output_dir = os.path.normpath(
     os.path.join(SCRIPT_DIR, f"../../results/{record_count}/orm_{record_count}_v2")
 )
 os.makedirs(output_dir, exist_ok=True)
+cache_stats_dir = os.path.join(output_dir, "cache_stats")
+os.makedirs(cache_stats_dir, exist_ok=True)
+harness_dir = os.path.join(output_dir, "harness")
+latency_dir = os.path.join(output_dir, "latency")
+query_stats_dir = os.path.join(output_dir, "query_stats")
+profile_dir = os.path.join(output_dir, "profiles")
 
-customer_id = uuid.UUID("0af5bdfd-6e38-42bf-9925-ecd6fb2410be")
-new_email = "updated_email@example.com"
-
-
-@orm_connection()
-def insert_known_customer(session=None):
-    return insert_known_benchmark_customer(session)
+# read query style: plain select() per call, pre-built select() objects, or lambda_stmt
+QUERY_STYLES = {
+    "standard": (get_many_customers, fetch_top_spending_customers, get_one_customer_by_id),
+    "cached": (get_many_customers_cached, fetch_top_spending_customers_cached, get_one_customer_by_id_cached),
+    "lambda": (get_many_customers_lambda, fetch_top_spending_customers_lambda, get_one_customer_by_id_lambda),
+}
+query_style = os.environ.get("ORM_QUERY_STYLE", "standard").lower()
+get_many, fetch_top_spending, get_one_by_id = QUERY_STYLES[query_style]
 
+# index profile of the seeded database, read back rather than taken from $INDEX_PROFILE
+index_profile = orm_index_profile()
 
-# --------------------
-# CREATE
-# --------------------
+# serial or parallel (ORM and SQL pipelines at the same time), set by scripts/run_benchmarks.py
+execution_mode = os.environ.get("EXECUTION_MODE", "serial")
 
-@orm_connection(commit=False)
-def run_create_customer(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_create_customer_{record_count}.csv",
-        measure_power_secs=1.0,
-    )
-    tracker.start()
-    try:
-        # supply a fresh Customer() or build your own dict+model
-        create_customer(session=session, customer=Customer())
-    finally:
-        tracker.stop()
+# compiled cache size, query style, index profile and execution mode are benchmark dimensions,
+# recorded in the codecarbon project_name column
+project_name = f"orm_cache_{ORM_QUERY_CACHE}_{query_style}_idx_{index_profile}_{execution_mode}"
 
+CACHE_STAT_COLUMNS = ["cache_hit", "cache_miss", "caching_disabled", "no_cache_key", "no_dialect_support"]
 
-# --------------------
-# READ
-# --------------------
+# one energy tracker session for the whole run, see TRACKER_SESSION
+energy_session = TrackerSession(output_dir, project_name)
 
-@orm_connection(commit=False)
-def run_get_customers(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_get_customers_{record_count}.csv",
-        measure_power_secs=1.0,
-    )
-    tracker.start()
-    try:
-        get_many_customers(session=session)
-    finally:
-        tracker.stop()
+customer_id = uuid.UUID("0af5bdfd-6e38-42bf-9925-ecd6fb2410be")
+new_email = "updated_email@example.com"
 
 
-@orm_connection(commit=False)
-def run_get_customer_by_id(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_get_customer_by_id_{record_count}.csv",
-        measure_power_secs=1.0,
+class CacheStatsTracker:
+    """Wraps an energy tracker and also writes the engine's compiled cache hits/misses for the tracked
+    window to cache_stats/<output_file>, next to the energy results."""
+
+    def __init__(self, tracker, output_file):
+        self.tracker = tracker
+        self._stats_file = os.path.join(cache_stats_dir, output_file)
+        self._stats_before = {}
+
+    @property
+    def final_emissions_data(self):
+        return getattr(self.tracker, "final_emissions_data", None)
+
+    def start(self):
+        self._stats_before = orm_cache_stats()
+        self.tracker.start()
+
+    def stop(self):
+        emissions = self.tracker.stop()
+        stats_after = orm_cache_stats()
+        row = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "project_name": project_name,
+            "query_cache_size": ORM_QUERY_CACHE_SIZE,
+        }
+        for column in CACHE_STAT_COLUMNS:
+            row[column] = stats_after.get(column, 0) - self._stats_before.get(column, 0)
+
+        write_header = not os.path.exists(self._stats_file)
+        with open(self._stats_file, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(row))
+            if write_header:
+                writer.writeheader()
+            writer.writerow(row)
+        return emissions
+
+
+def track(output_file, operation, read_only=False, session=None):
+    """Measure operation with the repetition harness as one task of the energy session."""
+    measure_operation(
+        CacheStatsTracker(energy_session.task(output_file), output_file),
+        operation,
+        isolation=lambda: orm_savepoint(session),
+        read_only=read_only,
+        reset=session.expunge_all,
+        summary_path=os.path.join(harness_dir, output_file),
+        project_name=project_name,
+        profile_path=os.path.join(profile_dir, output_file.replace(".csv", ".folded")) if PROFILE else None,
+        backend_pid=orm_backend_pid(session),
     )
-    tracker.start()
-    try:
-        get_one_customer_by_id(session=session, customer_id=customer_id)
-    finally:
-        tracker.stop()
 
 
-@orm_connection(commit=False)
-def run_fetch_top_spending_customers(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_fetch_top_spending_customers_{record_count}.csv",
-        measure_power_secs=1.0,
-    )
-    tracker.start()
-    try:
-        fetch_top_spending_customers(session=session, limit=10)
-    finally:
-        tracker.stop()
-
+@orm_connection()
+def insert_known_customer(session=None):
+    return insert_known_benchmark_customer(session)
 
-# --------------------
-# UPDATE
-# --------------------
 
-@orm_connection(commit=False)
-def run_update_customer_email(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_update_customer_email_{record_count}.csv",
-        measure_power_secs=1.0,
-    )
-    tracker.start()
-    try:
-        update_one_customer_email(
+def build_bulk_records(batch_size):
+    return [
+        {
+            "customer_id": uuid.uuid4(),
+            "name": "Bulk User",
+            "age": 40,
+            "email": f"bulk_{i}_{uuid.uuid4().hex}@example.com",
+            "signup_date": date(2023, 1, 1),
+            "monthly_spend": 88.88,
+            "contract_type": "Monthly",
+            "is_active": True,
+        }
+        for i in range(batch_size)
+    ]
+
+
+def stream_customers(session, fetch_size):
+    for _ in stream_many_customers(session=session, fetch_size=fetch_size):
+        pass
+
+
+# operation name -> repository call, shared names with the SQL registry
+OPERATIONS = {
+    "create_customer": Operation(
+        lambda session: create_customer(session=session, customer=Customer())
+    ),
+    "create_customers_bulk": Operation(
+        lambda session, records: create_customers_bulk(session=session, records=records),
+        prepare=lambda session, batch_size: {"records": build_bulk_records(batch_size)},
+    ),
+    "get_customers": Operation(
+        lambda session: get_many(session=session),
+        read_only=True,
+    ),
+    "stream_customers": Operation(
+        lambda session, fetch_size=2000: stream_customers(session, fetch_size),
+        read_only=True,
+    ),
+    "get_customer_by_id": Operation(
+        lambda session, customer_id=customer_id: get_one_by_id(
+            session=session, customer_id=uuid.UUID(str(customer_id))
+        ),
+        read_only=True,
+    ),
+    "get_customers_by_ids": Operation(
+        lambda session, customer_ids: get_customers_by_ids(session=session, customer_ids=customer_ids),
+        prepare=lambda session, n: {"customer_ids": require_count(sample_customer_ids(session=session, n=n), n)},
+        read_only=True,
+    ),
+    "fetch_top_spending_customers": Operation(
+        lambda session, limit=10: fetch_top_spending(session=session, limit=limit),
+        read_only=True,
+    ),
+    "update_customer_email": Operation(
+        lambda session, customer_id=customer_id, new_email=new_email: update_one_customer_email(
             session=session,
-            customer_id=customer_id,
+            customer_id=uuid.UUID(str(customer_id)),
             new_email=new_email,
         )
-    finally:
-        tracker.stop()
-
-
-@orm_connection(commit=False)
-def run_update_many_prepaid_to_monthly(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_update_many_prepaid_to_monthly_{record_count}.csv",
-        measure_power_secs=1.0,
-    )
-    tracker.start()
-    try:
-        update_many_prepaid_to_monthly(session=session)
-    finally:
-        tracker.stop()
-
-
-# --------------------
-# DELETE
-# --------------------
-
-@orm_connection(commit=False)
-def run_delete_inactive_customers(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_delete_inactive_customers_{record_count}.csv",
-        measure_power_secs=1.0,
-    )
-    tracker.start()
-    try:
-        delete_many_inactive_customers(session=session)
-    finally:
-        tracker.stop()
-
-
-@orm_connection(commit=False)
-def run_delete_customer_by_id(session=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"orm_delete_customer_by_id_{record_count}.csv",
-        measure_power_secs=1.0,
-    )
-    tracker.start()
-    try:
-        delete_one_customer_by_id(session=session, customer_id=customer_id)
-    finally:
-        tracker.stop()
-
-
-
-def run_all_queries():
-    run_create_customer()
-    run_get_customers()
-    run_get_customer_by_id()
-    run_fetch_top_spending_customers()
-
-    run_update_customer_email()
-    run_update_many_prepaid_to_monthly()
-
-    run_delete_inactive_customers()
-    run_delete_customer_by_id()
+    ),
+    "update_many_contract_types": Operation(
+        lambda session: update_many_prepaid_to_monthly(session=session)
+    ),
+    "delete_inactive_customers": Operation(
+        lambda session: delete_many_inactive_customers(session=session)
+    ),
+    "delete_customer_by_id": Operation(
+        lambda session, customer_id=customer_id: delete_one_customer_by_id(
+            session=session,
+            customer_id=uuid.UUID(str(customer_id)),
+        )
+    ),
+}
+
+stack = Stack(
+    "orm",
+    orm_connection,
+    track,
+    OPERATIONS,
+    isolation=lambda session=None: orm_savepoint(session),
+    project_name=project_name,
+    reset=lambda session=None: session.expunge_all(),
+)
 
 
 if __name__ == "__main__":
     insert_known_customer()
-    run_all_queries()
\ No newline at end of file
+    try:
+        run_workload(stack, load_workload(), record_count)
+    finally:
+        energy_session.close()
+        export_histograms(latency_dir, f"{stack.name}_latency_{record_count}", project_name)
+        export_query_stats(query_stats_dir, stack.name, record_count, project_name)
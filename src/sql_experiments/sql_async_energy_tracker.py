@@ -0,0 +1,185 @@
+import os
+import uuid
+import asyncio
+import logging
+from datetime import date
+
+from src.data_access.db_config.async_database import async_sql_connection, close_async_pools
+from src.data_access.db_config.database import sql_index_profile
+from src.benchmark.energy import TrackerSession
+from src.data_access.db_config.latency import export_histograms
+from src.benchmark.harness import async_sql_savepoint
+from src.benchmark.workload import Stack, load_workload, require_count
+from src.benchmark.async_workload import AsyncOperation, run_workload_async, task_index, ASYNC_CONCURRENCY
+from src.data_access.repositories.sql.async_customer_repository import (
+    insert_known_benchmark_customer,
+    sample_customer_ids,
+    create_customer,
+    create_customers_bulk,
+    get_many_customers,
+    stream_many_customers,
+    fetch_top_spending_customers,
+    get_one_customer_by_id,
+    get_customers_by_ids,
+    update_one_customer_email,
+    update_many_prepaid_to_monthly,
+    delete_many_inactive_customers,
+    delete_one_customer_by_id,
+)
+
+# logging configuration
+logging.basicConfig()
+logging.getLogger("codecarbon").setLevel(logging.ERROR)
+
+record_count = int(os.environ.get("RECORD_COUNT", 1000))
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+output_dir = os.path.normpath(os.path.join(SCRIPT_DIR, f"../../results/{record_count}/sql_{record_count}_v2"))
+os.makedirs(output_dir, exist_ok=True)
+harness_dir = os.path.join(output_dir, "harness")
+latency_dir = os.path.join(output_dir, "latency")
+
+# index profile of the seeded database, read back rather than taken from $INDEX_PROFILE
+index_profile = sql_index_profile()
+
+# serial or parallel (ORM and SQL pipelines at the same time), set by scripts/run_benchmarks.py
+execution_mode = os.environ.get("EXECUTION_MODE", "serial")
+
+# concurrency, index profile and execution mode are benchmark dimensions, recorded in the codecarbon project_name column
+project_name = f"sql_async_c{ASYNC_CONCURRENCY}_idx_{index_profile}_{execution_mode}"
+
+# one energy tracker session for the whole run, see TRACKER_SESSION
+energy_session = TrackerSession(output_dir, project_name)
+
+customer_id = "0af5bdfd-6e38-42bf-9925-ecd6fb2410be"
+new_email = "updated_email@example.com"
+
+
+@async_sql_connection(commit=True)
+async def insert_known_customer(conn=None):
+    await insert_known_benchmark_customer(conn)
+
+
+def build_customer():
+    return {
+        "customer_id": str(uuid.uuid4()),
+        "name": "Temp User",
+        "age": 40,
+        # unique, so concurrent inserts don't queue on the email index entry of each other's uncommitted row
+        "email": f"temp_user_{uuid.uuid4().hex}@example.com",
+        "signup_date": date(2023, 1, 1),
+        "monthly_spend": 88.88,
+        "contract_type": "Monthly",
+        "is_active": True,
+    }
+
+
+def build_bulk_records(batch_size):
+    return [
+        {
+            "customer_id": str(uuid.uuid4()),
+            "name": "Bulk User",
+            "age": 40,
+            "email": f"bulk_{i}_{uuid.uuid4().hex}@example.com",
+            "signup_date": date(2023, 1, 1),
+            "monthly_spend": 88.88,
+            "contract_type": "Monthly",
+            "is_active": True,
+        }
+        for i in range(batch_size)
+    ]
+
+
+async def prepare_bulk_records(conn, batch_size):
+    return {"records": build_bulk_records(batch_size)}
+
+
+async def prepare_customer_ids(conn, n):
+    return {"customer_ids": require_count(await sample_customer_ids(conn, n), n)}
+
+
+async def prepare_task_customer(conn, **params):
+    # every coroutine changes a customer of its own, so they don't queue on each other's row lock
+    n = task_index() + 1
+    return {"customer_id": require_count(await sample_customer_ids(conn, n), n)[-1], **params}
+
+
+async def prepare_task_email(conn, **params):
+    # a new email per coroutine too, as emails are unique
+    return {"new_email": f"updated_email_{task_index()}@example.com", **await prepare_task_customer(conn, **params)}
+
+
+async def stream_customers(conn, fetch_size=2000):
+    async for _ in stream_many_customers(conn, fetch_size=fetch_size):
+        pass
+
+
+# operation name -> async repository call, same names as the sync registries
+OPERATIONS = {
+    "create_customer": AsyncOperation(
+        lambda conn: create_customer(conn, build_customer())
+    ),
+    "create_customers_bulk": AsyncOperation(
+        lambda conn, records: create_customers_bulk(conn, records),
+        prepare=prepare_bulk_records,
+    ),
+    "get_customers": AsyncOperation(
+        lambda conn: get_many_customers(conn),
+        full_table=True,
+        read_only=True,
+    ),
+    "stream_customers": AsyncOperation(stream_customers, read_only=True),
+    "get_customer_by_id": AsyncOperation(
+        lambda conn, customer_id=customer_id: get_one_customer_by_id(conn, customer_id),
+        read_only=True,
+    ),
+    "get_customers_by_ids": AsyncOperation(
+        lambda conn, customer_ids: get_customers_by_ids(conn, customer_ids),
+        prepare=prepare_customer_ids,
+        read_only=True,
+    ),
+    "fetch_top_spending_customers": AsyncOperation(
+        lambda conn, limit=10: fetch_top_spending_customers(conn, limit=limit),
+        read_only=True,
+    ),
+    "update_customer_email": AsyncOperation(
+        lambda conn, customer_id=customer_id, new_email=new_email: update_one_customer_email(
+            conn, customer_id, new_email
+        ),
+        prepare=prepare_task_email,
+    ),
+    "update_many_contract_types": AsyncOperation(
+        lambda conn: update_many_prepaid_to_monthly(conn),
+        full_table=True,
+    ),
+    "delete_inactive_customers": AsyncOperation(
+        lambda conn: delete_many_inactive_customers(conn),
+        full_table=True,
+    ),
+    "delete_customer_by_id": AsyncOperation(
+        lambda conn, customer_id=customer_id: delete_one_customer_by_id(conn, customer_id),
+        prepare=prepare_task_customer,
+    ),
+}
+
+stack = Stack(
+    "sql_async",
+    async_sql_connection,
+    None,
+    OPERATIONS,
+    isolation=lambda conn=None: async_sql_savepoint(conn),
+    project_name=project_name,
+)
+
+
+async def main():
+    try:
+        await insert_known_customer()
+        await run_workload_async(stack, load_workload(), record_count, energy_session, harness_dir)
+    finally:
+        await close_async_pools()
+        energy_session.close()
+        export_histograms(latency_dir, f"{stack.name}_latency_{record_count}", project_name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
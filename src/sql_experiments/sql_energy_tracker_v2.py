@@ -2,14 +2,25 @@ import os
 import logging
 import uuid
 
-from codecarbon import EmissionsTracker
-from src.data_access.db_config.database import sql_connection
+from src.data_access.db_config.database import sql_connection, sql_index_profile, SQL_CONNECTION_MODE
+from src.data_access.db_config.prepared_statements import SQL_PREPARED_STATEMENTS, statement_stats
+from src.benchmark.energy import TrackerSession
+from src.benchmark.profiler import PROFILE
+from src.benchmark.postgres_stats import sql_backend_pid
+from src.data_access.db_config.latency import export_histograms
+from src.data_access.db_config.query_stats import export_query_stats
+from src.benchmark.harness import measure_operation, sql_savepoint
+from src.benchmark.workload import Operation, Stack, load_workload, require_count, run_workload
 from src.data_access.repositories.sql.customer_repository import (
     insert_known_benchmark_customer,
+    sample_customer_ids,
     create_customer,
+    create_customers_bulk,
     get_many_customers,
+    stream_many_customers,
     fetch_top_spending_customers,
     get_one_customer_by_id,
+    get_customers_by_ids,
     update_one_customer_email,
     update_many_prepaid_to_monthly,
     delete_many_inactive_customers,
@@ -24,157 +35,147 @@ record_count = int(os.environ.get("RECORD_COUNT", 1000))
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 output_dir = os.path.normpath(os.path.join(SCRIPT_DIR, f"../../results/{record_count}/sql_{record_count}_v2"))
 os.makedirs(output_dir, exist_ok=True)
+harness_dir = os.path.join(output_dir, "harness")
+latency_dir = os.path.join(output_dir, "latency")
+query_stats_dir = os.path.join(output_dir, "query_stats")
+profile_dir = os.path.join(output_dir, "profiles")
+
+# index profile of the seeded database, read back rather than taken from $INDEX_PROFILE
+index_profile = sql_index_profile()
+
+# serial or parallel (ORM and SQL pipelines at the same time), set by scripts/run_benchmarks.py
+execution_mode = os.environ.get("EXECUTION_MODE", "serial")
+
+# connection mode, prepared statements, index profile and execution mode are benchmark dimensions,
+# recorded in the codecarbon project_name column
+project_name = (
+    f"sql_{SQL_CONNECTION_MODE}" + ("_prepared" if SQL_PREPARED_STATEMENTS else "")
+    + f"_idx_{index_profile}_{execution_mode}"
+)
+
+# one energy tracker session for the whole run, see TRACKER_SESSION
+energy_session = TrackerSession(output_dir, project_name)
 
 customer_id = "0af5bdfd-6e38-42bf-9925-ecd6fb2410be"
 new_email = "updated_email@example.com"
 
 
+def track(output_file, operation, read_only=False, cursor=None, conn=None):
+    """Measure operation with the repetition harness as one task of the energy session."""
+    measure_operation(
+        energy_session.task(output_file),
+        operation,
+        isolation=lambda: sql_savepoint(cursor),
+        read_only=read_only,
+        summary_path=os.path.join(harness_dir, output_file),
+        project_name=project_name,
+        profile_path=os.path.join(profile_dir, output_file.replace(".csv", ".folded")) if PROFILE else None,
+        backend_pid=sql_backend_pid(cursor),
+    )
+
+
 @sql_connection(commit=True)
 def insert_known_customer(cursor=None, conn=None):
     insert_known_benchmark_customer(cursor)
 
 
-@sql_connection(commit=False)
-def run_create_customer(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_create_customer_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        customer_data = {
+def build_customer():
+    return {
+        "customer_id": str(uuid.uuid4()),
+        "name": "Temp User",
+        "age": 40,
+        "email": "temp_user@example.com",
+        "signup_date": "2023-01-01",
+        "monthly_spend": 88.88,
+        "contract_type": "Monthly",
+        "is_active": True,
+    }
+
+
+def build_bulk_records(batch_size):
+    return [
+        {
             "customer_id": str(uuid.uuid4()),
-            "name": "Temp User",
+            "name": "Bulk User",
             "age": 40,
-            "email": "temp_user@example.com",
+            "email": f"bulk_{i}_{uuid.uuid4().hex}@example.com",
             "signup_date": "2023-01-01",
             "monthly_spend": 88.88,
             "contract_type": "Monthly",
             "is_active": True,
         }
-        create_customer(cursor, customer_data)
-    finally:
-        tracker.stop()
-
-
-@sql_connection(commit=False)
-def run_get_customers(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_get_customers_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        get_many_customers(cursor)
-    finally:
-        tracker.stop()
-
-
-@sql_connection(commit=False)
-def run_get_customer_by_id(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_get_customer_by_id_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        get_one_customer_by_id(cursor, customer_id)
-    finally:
-        tracker.stop()
-
-
-@sql_connection(commit=False)
-def run_fetch_top_spending_customers(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_fetch_top_spending_customers_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        fetch_top_spending_customers(cursor, limit=10)
-    finally:
-        tracker.stop()
-
-
-@sql_connection(commit=False)
-def run_update_customer_email(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_update_customer_email_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        update_one_customer_email(cursor, customer_id, new_email)
-    finally:
-        tracker.stop()
-
-
-@sql_connection(commit=False)
-def run_delete_inactive_customers(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_delete_inactive_customers_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        delete_many_inactive_customers(cursor)
-    finally:
-        tracker.stop()
-
-
-@sql_connection(commit=False)
-def run_update_many_contract_types(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_update_many_contract_types_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        update_many_prepaid_to_monthly(cursor)
-    finally:
-        tracker.stop()
-
-
-@sql_connection(commit=False)
-def run_delete_customer_by_id(cursor=None, conn=None):
-    tracker = EmissionsTracker(
-        tracking_mode="process",
-        output_dir=output_dir,
-        output_file=f"sql_delete_customer_by_id_{record_count}.csv",
-        measure_power_secs=1.0
-    )
-    tracker.start()
-    try:
-        delete_one_customer_by_id(cursor, customer_id)
-    finally:
-        tracker.stop()
-
-
-def run_all_queries():
-    run_create_customer()
-    run_get_customers()
-    run_get_customer_by_id()
-    run_fetch_top_spending_customers()
-    run_update_customer_email()
-    run_delete_inactive_customers()
-    run_update_many_contract_types()
-    run_delete_customer_by_id()
+        for i in range(batch_size)
+    ]
+
+
+def stream_customers(conn, fetch_size):
+    for _ in stream_many_customers(conn, fetch_size=fetch_size):
+        pass
+
+
+# operation name -> repository call, shared names with the ORM registry
+OPERATIONS = {
+    "create_customer": Operation(
+        lambda cursor, conn: create_customer(cursor, build_customer())
+    ),
+    "create_customers_bulk": Operation(
+        lambda cursor, conn, records: create_customers_bulk(cursor, records),
+        prepare=lambda cursor, conn, batch_size: {"records": build_bulk_records(batch_size)},
+    ),
+    "get_customers": Operation(
+        lambda cursor, conn: get_many_customers(cursor),
+        read_only=True,
+    ),
+    "stream_customers": Operation(
+        lambda cursor, conn, fetch_size=2000: stream_customers(conn, fetch_size),
+        read_only=True,
+    ),
+    "get_customer_by_id": Operation(
+        lambda cursor, conn, customer_id=customer_id: get_one_customer_by_id(cursor, customer_id),
+        read_only=True,
+    ),
+    "get_customers_by_ids": Operation(
+        lambda cursor, conn, customer_ids: get_customers_by_ids(cursor, customer_ids),
+        prepare=lambda cursor, conn, n: {"customer_ids": require_count(sample_customer_ids(cursor, n), n)},
+        read_only=True,
+    ),
+    "fetch_top_spending_customers": Operation(
+        lambda cursor, conn, limit=10: fetch_top_spending_customers(cursor, limit=limit),
+        read_only=True,
+    ),
+    "update_customer_email": Operation(
+        lambda cursor, conn, customer_id=customer_id, new_email=new_email: update_one_customer_email(
+            cursor, customer_id, new_email
+        )
+    ),
+    "update_many_contract_types": Operation(
+        lambda cursor, conn: update_many_prepaid_to_monthly(cursor)
+    ),
+    "delete_inactive_customers": Operation(
+        lambda cursor, conn: delete_many_inactive_customers(cursor)
+    ),
+    "delete_customer_by_id": Operation(
+        lambda cursor, conn, customer_id=customer_id: delete_one_customer_by_id(cursor, customer_id)
+    ),
+}
+
+stack = Stack(
+    "sql",
+    sql_connection,
+    track,
+    OPERATIONS,
+    isolation=lambda cursor=None, conn=None: sql_savepoint(cursor),
+    project_name=project_name,
+)
 
 
 if __name__ == "__main__":
     insert_known_customer()
-    run_all_queries()
+    try:
+        run_workload(stack, load_workload(), record_count)
+    finally:
+        energy_session.close()
+        export_histograms(latency_dir, f"{stack.name}_latency_{record_count}", project_name)
+        export_query_stats(query_stats_dir, stack.name, record_count, project_name)
+    if SQL_PREPARED_STATEMENTS:
+        print(f"Prepared statement stats: {statement_stats()}")